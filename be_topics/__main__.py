@@ -1,8 +1,107 @@
 import argparse
 import json
+import os
 import sys
+from typing import Optional
 
-from .pipeline import extract_topics
+from .aggregate import TopicAggregator
+from .bench import benchmark_plans, benchmark_tokenization, measure_peak_memory
+from .dedup import DuplicateIndex
+from .fetcher import RenderOptions
+from .parser import ParseLimits
+from .profiles import ProfileRegistry, load_profiles
+from .incremental import StateStore
+from .lexicon import build_lexicon_file, load_lexicon, vocabulary
+from .rescore import ScoreInputLog, rescore
+from .scoring import load_weights
+from .scheduler import HostScheduler
+from .pipeline import extract_batch, extract_topics, extract_from_archives
+
+
+def _add_limit_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--bounded", action="store_true", help="Bounded-memory parsing (caps nodes and text per field)")
+    p.add_argument("--max-nodes", type=int, default=None, help="Max HTML tags parsed in bounded mode")
+    p.add_argument("--max-field-chars", type=int, default=None, help="Max text characters kept per field in bounded mode")
+
+
+def _add_profile_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--profiles", default=None, help="JSON file with per-site extraction profiles")
+    p.add_argument("--no-structured-fast-path", action="store_true", help="Always score body text even when JSON-LD/microdata is rich")
+    p.add_argument("--weights", default=None, help="JSON file of scoring weights (source boosts, length boosts, model/unit multipliers)")
+    p.add_argument("--lexicon", default=None, help="Memory-mapped lexicon/stem file built with `lexicon build` (also read from $BE_TOPICS_LEXICON)")
+    p.add_argument("--state", default=None, help="JSON file of per-page section fingerprints for incremental re-extraction")
+    p.add_argument("--no-type-plans", action="store_true", help="Parse and score every source regardless of page type")
+    p.add_argument("--classify-only", action="store_true", help="Only classify pages (page type, confidence, signals); skip topic extraction")
+
+
+def _add_dedup_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--no-dedup", action="store_true", help="Process every page even if it duplicates an earlier one")
+    p.add_argument("--max-simhash-distance", type=int, default=3, help="Max Hamming distance for near-duplicate pages (0-3)")
+
+
+def _add_render_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--render", action="store_true", help="Render with Playwright (JS-heavy sites)")
+    p.add_argument("--render-wait", choices=("ready", "networkidle", "load"), default="ready", help="When a render is done: content settled (default), network idle, or the load event")
+    p.add_argument("--render-settle-ms", type=int, default=500, help="Quiet window (no DOM mutations, stable title/main text) that counts as content-ready")
+    p.add_argument("--render-main-only", action="store_true", help="Capture <head> and the main block instead of the whole rendered document")
+    p.add_argument("--render-allow-trackers", action="store_true", help="Do not block analytics/ad requests while rendering")
+    p.add_argument("--render-load-assets", action="store_true", help="Do not block images, media and fonts while rendering")
+    p.add_argument("--render-block-third-party", action="store_true", help="Also block scripts/XHR from other sites")
+    p.add_argument("--render-block", action="append", default=[], metavar="PATTERN", help="Extra URL substring to block while rendering (repeatable)")
+
+
+def _add_aggregate_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--aggregate", default=None, help="Write site- and section-level top topics for the run to this JSON file ('-' for stderr)")
+    p.add_argument("--aggregate-top-k", type=int, default=20, help="Topics per site/section in the aggregate report")
+    p.add_argument("--section-depth", type=int, default=1, help="Path segments that define a section (e.g. 1: /blog, 2: /blog/2024)")
+    p.add_argument("--aggregate-capacity", type=int, default=1000, help="Topics tracked per site (sections keep a fifth of this)")
+
+
+def _add_score_log_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--save-score-inputs", default=None, help="Write per-page phrase TF and source counts as JSON lines (.gz ok) for `rescore`; not with --state")
+
+
+def _read_urls(path: str):
+    fh = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line in fh:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+
+def _profiles_from_args(args) -> Optional[ProfileRegistry]:
+    return load_profiles(args.profiles) if args.profiles else None
+
+
+def _limits_from_args(args) -> Optional[ParseLimits]:
+    if not (args.bounded or args.max_nodes is not None or args.max_field_chars is not None):
+        return None
+    limits = ParseLimits()
+    if args.max_nodes is not None:
+        limits.max_nodes = args.max_nodes
+    if args.max_field_chars is not None:
+        limits.max_field_chars = args.max_field_chars
+    return limits
+
+
+def _render_options_from_args(args) -> Optional[RenderOptions]:
+    if not args.render:
+        return None
+    options = RenderOptions(
+        wait=args.render_wait,
+        settle_ms=args.render_settle_ms,
+        block_trackers=not args.render_allow_trackers,
+        block_assets=not args.render_load_assets,
+        block_third_party=args.render_block_third_party,
+        main_only=args.render_main_only,
+    )
+    if args.render_block:
+        options.block_patterns = options.block_patterns + tuple(args.render_block)
+    return options
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -17,9 +116,68 @@ def build_parser() -> argparse.ArgumentParser:
     p_extract.add_argument("--top-k", type=int, default=8, help="Number of topics to return")
     p_extract.add_argument("--timeout", type=float, default=8.0, help="HTTP timeout seconds")
     p_extract.add_argument("--no-robots", action="store_true", help="Ignore robots.txt (not recommended)")
-    p_extract.add_argument("--render", action="store_true", help="Render with Playwright (JS-heavy sites)")
     p_extract.add_argument("--css-topics", action="store_true", help="Allow CSS-derived topics (classes/ids)")
     p_extract.add_argument("--verbose", action="store_true", help="Verbose errors")
+    _add_render_args(p_extract)
+    _add_limit_args(p_extract)
+    _add_profile_args(p_extract)
+
+    p_ingest = sub.add_parser("ingest", help="Extract topics from WARC files or saved HTML (no network)")
+    p_ingest.add_argument("paths", nargs="+", help="WARC/WARC.gz files, .html files or directories of saved pages")
+    p_ingest.add_argument("--top-k", type=int, default=8, help="Number of topics to return")
+    p_ingest.add_argument("--css-topics", action="store_true", help="Allow CSS-derived topics (classes/ids)")
+    _add_limit_args(p_ingest)
+    _add_profile_args(p_ingest)
+    _add_dedup_args(p_ingest)
+    _add_aggregate_args(p_ingest)
+    _add_score_log_args(p_ingest)
+
+    p_batch = sub.add_parser("batch", help="Extract topics for a list of URLs, reusing results for duplicate pages")
+    p_batch.add_argument("--input", required=True, help="File with one URL per line ('-' for stdin)")
+    p_batch.add_argument("--top-k", type=int, default=8, help="Number of topics to return")
+    p_batch.add_argument("--timeout", type=float, default=8.0, help="HTTP timeout seconds")
+    p_batch.add_argument("--no-robots", action="store_true", help="Ignore robots.txt (not recommended)")
+    p_batch.add_argument("--css-topics", action="store_true", help="Allow CSS-derived topics (classes/ids)")
+    p_batch.add_argument("--workers", type=int, default=8, help="Concurrent fetches across hosts")
+    p_batch.add_argument("--per-host", type=int, default=2, help="Max concurrent fetches per host")
+    p_batch.add_argument("--circuit-failures", type=int, default=3, help="Consecutive host failures (403/429/5xx/timeouts) that open a host's circuit")
+    p_batch.add_argument("--circuit-cooldown", type=float, default=30.0, help="Seconds before an open circuit lets a probe through")
+    p_batch.add_argument("--slow-host-seconds", type=float, default=4.0, help="Latency above which a host is deprioritized and not retried")
+    _add_render_args(p_batch)
+    _add_limit_args(p_batch)
+    _add_profile_args(p_batch)
+    _add_dedup_args(p_batch)
+    _add_aggregate_args(p_batch)
+    _add_score_log_args(p_batch)
+
+    p_rescore = sub.add_parser("rescore", help="Re-rank pages logged with --save-score-inputs under new weights (no fetch/parse)")
+    p_rescore.add_argument("inputs", nargs="+", help="Files written by --save-score-inputs")
+    p_rescore.add_argument("--weights", default=None, help="JSON file of scoring weights (defaults: built-in tuning)")
+    p_rescore.add_argument("--top-k", type=int, default=8, help="Number of topics to return")
+    p_rescore.add_argument("--batch-pages", type=int, default=5000, help="Pages scored per vectorized batch")
+
+    p_bench = sub.add_parser("bench", help="Benchmarks over saved pages")
+    bench_sub = p_bench.add_subparsers(dest="bench_command", required=True)
+    p_mem = bench_sub.add_parser("memory", help="Peak allocation per page (tracemalloc)")
+    p_mem.add_argument("paths", nargs="+", help="WARC/WARC.gz files, .html files or directories of saved pages")
+    p_mem.add_argument("--max-peak-mb", type=float, default=None, help="Exit non-zero if any page peaks above this")
+    _add_limit_args(p_mem)
+    p_plans = bench_sub.add_parser("plans", help="CPU savings vs topic quality of page-type plans on a labeled corpus")
+    p_plans.add_argument("labels", help='JSON lines: {"path": ..., "page_type": ..., "topics": [...]}')
+    p_plans.add_argument("--top-k", type=int, default=8, help="Number of topics to compare")
+    p_plans.add_argument("--repeat", type=int, default=3, help="Runs per page; the fastest is kept")
+    _add_limit_args(p_plans)
+    p_tok = bench_sub.add_parser("tokenize", help="Phrase extraction throughput per language; English dispatch overhead")
+    p_tok.add_argument("paths", nargs="+", help="WARC/WARC.gz files, .html files or directories of saved pages")
+    p_tok.add_argument("--repeat", type=int, default=5, help="Runs per page; the fastest is kept")
+    p_tok.add_argument("--max-english-overhead", type=float, default=None, help="Exit non-zero if the English path is slower than this fraction (e.g. 0.05)")
+
+    p_lex = sub.add_parser("lexicon", help="Shared memory-mapped lexicon/stem files")
+    lex_sub = p_lex.add_subparsers(dest="lexicon_command", required=True)
+    p_build = lex_sub.add_parser("build", help="Precompute stems for a vocabulary and write a lexicon file")
+    p_build.add_argument("output", help="Lexicon file to write")
+    p_build.add_argument("paths", nargs="*", help="Saved pages/WARCs whose words join the vocabulary")
+    p_build.add_argument("--words", action="append", default=[], help="Word list, one or more words per line (repeatable)")
 
     return parser
 
@@ -27,19 +185,115 @@ def build_parser() -> argparse.ArgumentParser:
 def main(argv=None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    if getattr(args, "lexicon", None):
+        load_lexicon(args.lexicon)
 
     if args.command == "extract":
+        state = StateStore(args.state) if args.state else None
         result = extract_topics(
             url=args.url,
             top_k=args.top_k,
             timeout=args.timeout,
             respect_robots=not args.no_robots,
             render=args.render,
+            render_options=_render_options_from_args(args),
             include_css_topics=args.css_topics,
+            limits=_limits_from_args(args),
+            profiles=_profiles_from_args(args),
+            structured_fast_path=not args.no_structured_fast_path,
+            state=state,
+            classify_only=args.classify_only,
+            type_plans=not args.no_type_plans,
+            weights=load_weights(args.weights) if args.weights else None,
         )
+        if state is not None:
+            state.save()
         print(json.dumps(result, ensure_ascii=False, indent=2))
         return 0
 
+    if args.command in ("ingest", "batch"):
+        if args.state and args.save_score_inputs:
+            # Unchanged pages are answered from the state file without scoring, so the log would miss them
+            parser.error("--save-score-inputs cannot be combined with --state")
+        state = StateStore(args.state) if args.state else None
+        profiles = _profiles_from_args(args)
+        dedup = None
+        if not args.no_dedup:
+            try:
+                dedup = DuplicateIndex(max_distance=args.max_simhash_distance, profiles=profiles)
+            except ValueError as exc:
+                parser.error(f"--max-simhash-distance: {exc}")
+        common = dict(top_k=args.top_k, include_css_topics=args.css_topics, limits=_limits_from_args(args), profiles=profiles, structured_fast_path=not args.no_structured_fast_path, state=state, dedup=dedup, classify_only=args.classify_only, type_plans=not args.no_type_plans)
+        common["weights"] = load_weights(args.weights) if args.weights else None
+        score_log = ScoreInputLog(args.save_score_inputs) if args.save_score_inputs else None
+        common["score_log"] = score_log
+        try:
+            scheduler = None
+            if args.command == "ingest":
+                results = extract_from_archives(args.paths, **common)
+            else:
+                scheduler = HostScheduler(workers=args.workers, per_host=args.per_host, failure_threshold=args.circuit_failures, cooldown=args.circuit_cooldown, slow_seconds=args.slow_host_seconds)
+                results = extract_batch(_read_urls(args.input), timeout=args.timeout, respect_robots=not args.no_robots, render=args.render, render_options=_render_options_from_args(args), scheduler=scheduler, **common)
+            aggregator = None
+            if args.aggregate:
+                capacity = max(1, args.aggregate_capacity)
+                aggregator = TopicAggregator(prefix_depth=args.section_depth, site_capacity=capacity, section_capacity=max(1, capacity // 5))
+                results = aggregator.add_all(results)
+            # One JSON object per line so large archives can be streamed
+            for result in results:
+                print(json.dumps(result, ensure_ascii=False))
+        finally:
+            if score_log is not None:
+                score_log.close()
+        if state is not None:
+            state.save()
+        if dedup is not None:
+            print(json.dumps({"dedup": dedup.stats.to_dict()}), file=sys.stderr)
+        if scheduler is not None:
+            print(json.dumps({"hosts": scheduler.report()}, indent=2), file=sys.stderr)
+        if aggregator is not None:
+            report = aggregator.report(top_k=args.aggregate_top_k)
+            if args.aggregate == "-":
+                print(json.dumps({"aggregate": report}, ensure_ascii=False, indent=2), file=sys.stderr)
+            else:
+                with open(args.aggregate, "w", encoding="utf-8") as fh:
+                    json.dump(report, fh, ensure_ascii=False, indent=2)
+        return 0
+
+    if args.command == "rescore":
+        stats: dict = {}
+        weights = load_weights(args.weights) if args.weights else None
+        for result in rescore(args.inputs, weights=weights, top_k=args.top_k, batch_pages=args.batch_pages, stats=stats):
+            print(json.dumps(result, ensure_ascii=False))
+        print(json.dumps({"rescore": stats}), file=sys.stderr)
+        return 0
+
+    if args.command == "bench" and args.bench_command == "memory":
+        report = measure_peak_memory(args.paths, limits=_limits_from_args(args))
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        # Usable as a regression gate in CI
+        if args.max_peak_mb is not None and report["peak_bytes"] > args.max_peak_mb * 1024 * 1024:
+            return 1
+        return 0
+
+    if args.command == "lexicon" and args.lexicon_command == "build":
+        counts = build_lexicon_file(args.output, vocabulary(args.words, args.paths))
+        print(json.dumps({"output": args.output, "bytes": os.path.getsize(args.output), "entries": counts}, indent=2))
+        return 0
+
+    if args.command == "bench" and args.bench_command == "tokenize":
+        report = benchmark_tokenization(args.paths, repeat=args.repeat)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        overhead = report["english_overhead"]
+        if args.max_english_overhead is not None and overhead is not None and overhead > args.max_english_overhead:
+            return 1
+        return 0
+
+    if args.command == "bench" and args.bench_command == "plans":
+        report = benchmark_plans(args.labels, top_k=args.top_k, repeat=args.repeat, limits=_limits_from_args(args))
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+
     return 1
 
 
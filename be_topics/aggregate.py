@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .language import ENGLISH
+from .scoring import _stem_key
+
+
+OTHER_GROUP = "(other)"
+LOCAL_SITE = "(local)"  # saved pages without a host (file paths)
+
+
+class SpaceSaving:
+    """Weighted space-saving heavy-hitter sketch over at most ``capacity`` keys.
+
+    Counts never under-estimate; ``error`` bounds the over-estimate of each key.
+    Sketches are mergeable, so per-worker aggregates can be combined.
+    """
+
+    __slots__ = ("capacity", "counts", "labels", "_heap")
+
+    def __init__(self, capacity: int = 500) -> None:
+        self.capacity = capacity
+        self.counts: Dict[str, List[float]] = {}  # key → [count, error, pages]
+        self.labels: Dict[str, str] = {}  # key → first display text seen
+        self._heap: List[Tuple[float, str]] = []  # lazy min-heap; stale entries are skipped
+
+    def _pop_min(self) -> Tuple[str, float]:
+        while True:
+            count, key = heapq.heappop(self._heap)
+            entry = self.counts.get(key)
+            if entry is not None and entry[0] == count:
+                return key, count
+
+    def add(self, key: str, weight: float = 1.0, label: Optional[str] = None, pages: int = 1) -> None:
+        entry = self.counts.get(key)
+        if entry is not None:
+            entry[0] += weight
+            entry[2] += pages
+        else:
+            if len(self.counts) < self.capacity:
+                entry = self.counts[key] = [weight, 0.0, pages]
+            else:
+                # The newcomer inherits the evicted minimum as its error bound
+                old_key, floor = self._pop_min()
+                del self.counts[old_key]
+                self.labels.pop(old_key, None)
+                entry = self.counts[key] = [floor + weight, floor, pages]
+            self.labels[key] = label or key
+        heapq.heappush(self._heap, (entry[0], key))
+        if len(self._heap) > 4 * self.capacity + 64:
+            self._heap = [(e[0], k) for k, e in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def merge(self, other: "SpaceSaving") -> None:
+        for key, (count, error, pages) in other.counts.items():
+            self.add(key, count, other.labels.get(key), pages)
+            self.counts[key][1] += error
+
+    def top(self, k: int) -> List[Tuple[str, float, float, int]]:
+        ranked = sorted(self.counts.items(), key=lambda kv: -kv[1][0])[:k]
+        return [(self.labels.get(key, key), count, error, int(pages)) for key, (count, error, pages) in ranked]
+
+
+def _site_of(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    if not host:
+        return LOCAL_SITE
+    return host[4:] if host.startswith("www.") else host
+
+
+def _section_of(url: str, depth: int) -> str:
+    segs = [s for s in urlparse(url).path.split("/") if s][:depth]
+    return "/" + "/".join(segs)
+
+
+class TopicAggregator:
+    """Site- and section-level topic maps built from a stream of pipeline results.
+
+    Memory is bounded by ``site_capacity``/``section_capacity`` topics per group
+    and ``max_sites``/``max_sections`` groups; groups beyond the limits are
+    folded into ``(other)``. Each page contributes a total weight of 1, split
+    over its topics by score, so long pages do not dominate a site.
+    """
+
+    def __init__(
+        self,
+        prefix_depth: int = 1,
+        site_capacity: int = 1000,
+        section_capacity: int = 200,
+        max_sites: int = 10_000,
+        max_sections: int = 50_000,
+    ) -> None:
+        self.prefix_depth = prefix_depth
+        self.site_capacity = site_capacity
+        self.section_capacity = section_capacity
+        self.max_sites = max_sites
+        self.max_sections = max_sections
+        self.sites: Dict[str, SpaceSaving] = {}
+        self.sections: Dict[Tuple[str, str], SpaceSaving] = {}
+        self.site_pages: Dict[str, int] = {}
+        self.section_pages: Dict[Tuple[str, str], int] = {}
+
+    def _group(self, groups: Dict[Any, SpaceSaving], key: Any, other: Any, limit: int, capacity: int) -> Tuple[Any, SpaceSaving]:
+        sketch = groups.get(key)
+        if sketch is None:
+            if len(groups) >= limit:
+                key = other
+                sketch = groups.get(key)
+            if sketch is None:
+                sketch = groups[key] = SpaceSaving(capacity)
+        return key, sketch
+
+    def add(self, result: Dict[str, Any]) -> None:
+        """Fold one pipeline result in; errors and dedup reuses are skipped."""
+        topics = result.get("topics") or []
+        if "error" in result or "duplicate_of" in result or not topics:
+            return
+        url = result.get("url", "")
+        site = _site_of(url)
+        lang = result.get("language", ENGLISH)
+        site_key, site_sketch = self._group(self.sites, site, OTHER_GROUP, self.max_sites, self.site_capacity)
+        section = (site_key, _section_of(url, self.prefix_depth))
+        section_key, section_sketch = self._group(self.sections, section, (site_key, OTHER_GROUP), self.max_sections, self.section_capacity)
+        self.site_pages[site_key] = self.site_pages.get(site_key, 0) + 1
+        self.section_pages[section_key] = self.section_pages.get(section_key, 0) + 1
+        total = sum(max(0.0, t.get("score", 0.0)) for t in topics)
+        # Variants that share a stem key count once per page
+        page: Dict[str, List[Any]] = {}
+        for t in topics:
+            key = _stem_key(t["text"], lang)
+            # Zero-score topics get no share unless every topic scored zero
+            weight = max(0.0, t.get("score", 0.0)) / total if total else 1.0 / len(topics)
+            if key in page:
+                page[key][0] += weight
+            else:
+                page[key] = [weight, t["text"]]
+        for key, (weight, text) in page.items():
+            if not weight:
+                continue
+            site_sketch.add(key, weight, text)
+            section_sketch.add(key, weight, text)
+
+    def add_all(self, results: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+        """Pass results through unchanged while aggregating them."""
+        for result in results:
+            self.add(result)
+            yield result
+
+    def merge(self, other: "TopicAggregator") -> None:
+        # Page counts follow their sketch, so groups folded into (other) here count there
+        site_keys: Dict[str, str] = {}
+        for site, sketch in other.sites.items():
+            key, mine = self._group(self.sites, site, OTHER_GROUP, self.max_sites, self.site_capacity)
+            site_keys[site] = key
+            mine.merge(sketch)
+            self.site_pages[key] = self.site_pages.get(key, 0) + other.site_pages.get(site, 0)
+        for section, sketch in other.sections.items():
+            site_key = site_keys.get(section[0], section[0])
+            key, mine = self._group(self.sections, (site_key, section[1]), (site_key, OTHER_GROUP), self.max_sections, self.section_capacity)
+            mine.merge(sketch)
+            self.section_pages[key] = self.section_pages.get(key, 0) + other.section_pages.get(section, 0)
+
+    @staticmethod
+    def _topics(sketch: SpaceSaving, pages: int, top_k: int) -> List[Dict[str, Any]]:
+        return [
+            {"text": text, "weight": round(count, 4), "share": round(count / pages, 4) if pages else 0.0, "pages": n, "error": round(error, 4)}
+            for text, count, error, n in sketch.top(top_k)
+        ]
+
+    def report(self, top_k: int = 20) -> Dict[str, Any]:
+        sites: Dict[str, Any] = {}
+        for site, sketch in sorted(self.sites.items(), key=lambda kv: -self.site_pages.get(kv[0], 0)):
+            pages = self.site_pages.get(site, 0)
+            sites[site] = {"pages": pages, "topics": self._topics(sketch, pages, top_k), "sections": {}}
+        for (site, prefix), sketch in sorted(self.sections.items(), key=lambda kv: -self.section_pages.get(kv[0], 0)):
+            pages = self.section_pages.get((site, prefix), 0)
+            sites.setdefault(site, {"pages": 0, "topics": [], "sections": {}})["sections"][prefix] = {
+                "pages": pages,
+                "topics": self._topics(sketch, pages, top_k),
+            }
+        return {"prefix_depth": self.prefix_depth, "sites": sites}
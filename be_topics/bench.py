@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, List, Optional
+
+from .ingest import iter_records
+from .parser import ParseLimits
+from .pipeline import extract_from_fetch
+
+
+def measure_peak_memory(paths: Iterable[str], limits: Optional[ParseLimits] = None) -> Dict[str, Any]:
+    """Run offline extraction over saved pages and report the per-page allocation peak."""
+    pages: list = []
+    tracemalloc.start()
+    try:
+        for fetch in iter_records(paths):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            t0 = time.perf_counter()
+            extract_from_fetch(fetch, limits=limits)
+            elapsed = time.perf_counter() - t0
+            _, peak = tracemalloc.get_traced_memory()
+            pages.append({"url": fetch.url, "peak_bytes": peak - base, "seconds": round(elapsed, 4)})
+    finally:
+        tracemalloc.stop()
+    return {
+        "bounded": limits is not None,
+        "pages": len(pages),
+        "peak_bytes": max((p["peak_bytes"] for p in pages), default=0),
+        "per_page": pages,
+    }
+
+
+def _matches(expected: str, topics: List[str]) -> bool:
+    e = expected.lower()
+    return any(e in t or t in e for t in topics)
+
+
+def benchmark_plans(labels_path: str, top_k: int = 8, repeat: int = 3, limits: Optional[ParseLimits] = None) -> Dict[str, Any]:
+    """CPU time and topic quality of page-type plans against full extraction on a labeled corpus.
+
+    ``labels_path`` is JSON lines: ``{"path": "page.html", "page_type": "product", "topics": ["..."]}``
+    with paths relative to the labels file. Quality is recall of the labeled topics in the top-k;
+    ``overlap`` is the share of the full run's top-k that the planned run also returns.
+    """
+    base_dir = os.path.dirname(os.path.abspath(labels_path))
+    rows: List[Dict[str, Any]] = []
+    with open(labels_path, "r", encoding="utf-8") as fh:
+        labels = [json.loads(line) for line in fh if line.strip()]
+    for label in labels:
+        path = os.path.join(base_dir, label["path"])
+        fetch = next(iter_records([path]), None)
+        if fetch is None:
+            continue
+        runs: Dict[str, Dict[str, Any]] = {}
+        for mode, type_plans in (("full", False), ("planned", True)):
+            best = float("inf")
+            for _ in range(max(1, repeat)):
+                t0 = time.process_time()
+                result = extract_from_fetch(fetch, top_k=top_k, limits=limits, type_plans=type_plans)
+                best = min(best, time.process_time() - t0)
+            runs[mode] = {"cpu": best, "topics": [t["text"] for t in result.get("topics", [])], "page_type": result.get("page_type")}
+        expected = label.get("topics") or []
+        full, planned = runs["full"]["topics"], runs["planned"]["topics"]
+        rows.append({
+            "path": label["path"],
+            "label": label.get("page_type"),
+            "page_type": runs["planned"]["page_type"],
+            "cpu_full": round(runs["full"]["cpu"], 4),
+            "cpu_planned": round(runs["planned"]["cpu"], 4),
+            "recall_full": round(sum(_matches(e, full) for e in expected) / len(expected), 3) if expected else None,
+            "recall_planned": round(sum(_matches(e, planned) for e in expected) / len(expected), 3) if expected else None,
+            "overlap": round(len(set(full) & set(planned)) / len(full), 3) if full else 1.0,
+        })
+
+    def _summary(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        cpu_full = sum(r["cpu_full"] for r in group)
+        cpu_planned = sum(r["cpu_planned"] for r in group)
+        recalls = [r for r in group if r["recall_full"] is not None]
+        labelled = [r for r in group if r["label"]]
+        return {
+            "pages": len(group),
+            "cpu_full": round(cpu_full, 4),
+            "cpu_planned": round(cpu_planned, 4),
+            "cpu_savings": round(1 - cpu_planned / cpu_full, 3) if cpu_full else 0.0,
+            "recall_full": round(sum(r["recall_full"] for r in recalls) / len(recalls), 3) if recalls else None,
+            "recall_planned": round(sum(r["recall_planned"] for r in recalls) / len(recalls), 3) if recalls else None,
+            "overlap": round(sum(r["overlap"] for r in group) / len(group), 3) if group else None,
+            "classification_accuracy": round(sum(r["label"] == r["page_type"] for r in labelled) / len(labelled), 3) if labelled else None,
+        }
+
+    by_type: Dict[str, List[Dict[str, Any]]] = {}
+    for r in rows:
+        by_type.setdefault(r["page_type"], []).append(r)
+    return {
+        "top_k": top_k,
+        "overall": _summary(rows),
+        "by_plan": {t: _summary(group) for t, group in sorted(by_type.items())},
+        "per_page": rows,
+    }
+
+
+def benchmark_tokenization(paths: Iterable[str], repeat: int = 5) -> Dict[str, Any]:
+    """Phrase-extraction throughput per detected language over saved pages.
+
+    For English pages it also times the pre-multilingual code path
+    (``_extract_phrases_english`` called directly) against the language-aware
+    entry point, so ``english_overhead`` shows what detection and dispatch cost.
+    ``detect_us_per_page`` times the title/lead-paragraph guess on its own, as
+    paid by pages without ``<html lang>`` or ``Content-Language``.
+    """
+    from .candidates import _extract_phrases_english, _extract_phrases_from_text, candidate_sections
+    from .language import ENGLISH, detect_language
+    from .parser import parse_content
+
+    per_lang: Dict[str, Dict[str, Any]] = {}
+    english_direct = english_dispatch = 0.0
+    for fetch in iter_records(paths):
+        if not fetch.text:
+            continue
+        content = parse_content(fetch.text)
+        sections = candidate_sections(content, fetch.url)
+        sample = " ".join([content.title, *content.paragraphs[:3]])
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            lang = detect_language(content.lang, fetch.content_language or "", sample)
+            phrases = sum(len(_extract_phrases_from_text(text, source, lang=lang)) for source, text in sections)
+            best = min(best, time.perf_counter() - t0)
+        detect = float("inf")
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            detect_language("", "", sample)
+            detect = min(detect, time.perf_counter() - t0)
+        row = per_lang.setdefault(lang, {"pages": 0, "sections": 0, "phrases": 0, "seconds": 0.0, "detect_seconds": 0.0})
+        row["pages"] += 1
+        row["detect_seconds"] += detect
+        row["sections"] += len(sections)
+        row["phrases"] += phrases
+        row["seconds"] += best
+        if lang == ENGLISH:
+            direct = float("inf")
+            for _ in range(max(1, repeat)):
+                t0 = time.perf_counter()
+                for source, text in sections:
+                    _extract_phrases_english(text, source)
+                direct = min(direct, time.perf_counter() - t0)
+            english_direct += direct
+            english_dispatch += best
+    for row in per_lang.values():
+        row["us_per_section"] = round(row["seconds"] / row["sections"] * 1e6, 1) if row["sections"] else 0.0
+        row["detect_us_per_page"] = round(row.pop("detect_seconds") / row["pages"] * 1e6, 1)
+        row["seconds"] = round(row["seconds"], 4)
+    return {
+        "languages": per_lang,
+        "english_overhead": round(english_dispatch / english_direct - 1, 4) if english_direct else None,
+    }
@@ -2,83 +2,27 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import Iterable, List, Tuple
+from typing import AbstractSet, Dict, Iterable, List, Optional, Tuple
 import ssl
 import nltk
 
 from nltk.stem import PorterStemmer
 
+from .intern import phrase_table
+from .language import CJK_RE, ENGLISH, ENGLISH_STOPWORDS, ENGLISH_TOKEN_RE, PRONOUNS_DET, STOP_VERBS, LanguageSupport, get_language
 from .parser import PageContent
+from .profiles import DEFAULT, DEFAULT_REGISTRY, SiteProfile
 
 
-try:
-    # nltk.download("punkt")
-    # nltk.download("punkt_tab")
-    # nltk.download("stopwords")
-    # ssl._create_default_https_context = _create_unverified_https_context
-    from nltk.corpus import stopwords  # type: ignore
-
-    # nltk.download("punkt")
-    # nltk.download("punkt_tab")
-    # nltk.download("stopwords")
-    # print("Downloaded")
-
-    ok = {
-        'any', 'haven', 'aren', 'himself', 'ain', 'mustn', 'doesn', 'herself', "isn't", 'can', 'both', 'needn', 'myself', "he's", 'once',
-        "a","an","the","and","or","but","if","then","else","for","to","of","in","on","with","by","from",
-        "at","as","is","are","was","were","be","been","being","this","that","these","those","it","its",
-        "you","your","we","our","they","their","he","she","his","her","them","us","i","me","my", "control", "becoming"
-        "about","into","over","under","up","down","out","off","so","not","no","yes","can","will","make","makes", "feature","featured",
-        'doing', 'same', 'is', "he'll", 'down', 'themselves', 'own', "couldn't", "she'd", 'o', 'into', 'was', 'yourselves', "you've", 'and', 'd', 'about', "we'll", 'where', "won't", "they're", "i'm", 'weren', 'hers', 'above', 'we', 'my', 'off', "i'll", 'shouldn', 'those', 'theirs', 'just', 'itself', 'again', 'here', 'his', 'all', 'hadn', 'while', 'or', "should've", 'whom', "she's", 'she', 'why', 'he', 'through', 'during', 'each', "hadn't", 'had', "you'll", 'at', "doesn't", 'these', 'how', 'but', "we've", 'isn', 'him', "wasn't", 'were', 'has', "we'd", 'me', "they've", 'did', 'wouldn', 'against', 'will', "hasn't", 'between', 'are', 'the', 'your', "didn't", "aren't", "he'd", 've', 'which', 'very', 'mightn', 'until', "shan't", "you'd", 'because', "she'll", 'other', 'don', 'in', "they'd", 'wasn', 'from', 'won', 'having', 'our', 'couldn', 'for', 'to', "they'll", 'their', 'then', 'ma', 'too', 'y', 'a', "that'll", "i'd", 'when', "we're", "wouldn't", 'as', 'what', 'you', 'does', 'than', 'it', 'shan', 'now', 'of', 'i', 'below', 're', 'ours', "it's", 'yourself', 'before', 'few', 'll', 'didn', "i've", 'on', 'out', 'that', 'after', "it'd", "needn't", 'have', 'such', "shouldn't", 'so', 'who', 'more', 'should', 'under', 'them', "mustn't", "it'll", 'this', "weren't", 'hasn', 'further', 'yours', 'they', 'am', 'with', 'there', "haven't", 'some', 'by', 'over', 'an', 'its', 'up', 'been', 'being', 't', "you're", 'no', 'do', 'most', "don't", 'if', 'her', 'm', 'be', 'not', 'only', 's', "mightn't", 'nor', 'ourselves'}
-
-    _STOPWORDS = set(ok)  # requires corpus; may fail
-except Exception as e:
-    print(f"Exception: {e}")
-    # Minimal fallback stopword list to avoid NLTK downloads
-    # _STOPWORDS = {
-    #     "a","an","the","and","or","but","if","then","else","for","to","of","in","on","with","by","from",
-    #     "at","as","is","are","was","were","be","been","being","this","that","these","those","it","its",
-    #     "you","your","we","our","they","their","he","she","his","her","them","us","i","me","my",
-    #     "about","into","over","under","up","down","out","off","so","not","no","yes","can","will","make","makes", "feature","featured"
-    # }
-_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:[.\-][A-Za-z0-9]+)*")
 _STEMMER = PorterStemmer()
-_STOP_VERBS = {
-    "meet","start","enter","change","unmute","learn","click","submit","contact",
-}
-_PRONOUNS_DET = {"my","your","our","his","her","their","this","that","these","those"}
-
-# Generic e-commerce/navigation noise tokens and phrases
-_ECOM_NOISE_TOKENS = {
-    "amazon","com","hello","sign","account","lists","returns","orders","cart","all",
-    "today","deals","prime","video","registry","customer","service","gift","cards",
-    "sell","home","kitchen","share","sponsored","learn","more","search","shift","alt",
-    "view","history","keyboard","shortcuts","add","buying","options","compare","similar",
-    "items","previous","next","set","slides","ratings","stars","price","prices","usd",
-    "deliver","delivery","india","united","states","watch","now","download","pdf","link",
-}
-_ECOM_NOISE_PHRASES = {
-    "add to cart","buying options","compare with similar","keyboard shortcuts","hello sign in",
-    "returns & orders","gift cards","customer service","today's deals","prime video","0 cart",
-    "see more product details","report an issue","product description","product information",
-    "warranty & support","from the manufacturer","user manual","visit the store","learn more",
-}
-
-# Wikipedia/navigation/UI specific noise
-_WIKI_NOISE_TOKENS = {
-    "edit","jump","navigation","sidebar","toc","table","contents","toggle","subsection",
-    "move","hide","show","top","category","talk","read","view","history","source",
-    "wikipedia","wikidata","mediawiki",
-}
-_WIKI_NOISE_PHRASES = {
-    "move to sidebar","table of contents","edit this at wikidata","toggle subsection",
-    "download as pdf","printable version","permanent link","page information","cite this page",
-}
+# Leading/trailing words that make a multi-word phrase incomplete
+_EDGE_WORDS = ENGLISH_STOPWORDS | PRONOUNS_DET
 
 
 @dataclass
 class Candidate:
-    text: str
+    __slots__ = ("text", "source")
+    text: str  # shared PhraseTable copy, so repeats across pages are one string
     source: str  # title, h, body, url, meta, jsonld, alt
 
 
@@ -90,25 +34,16 @@ def _normalize_phrase(tokens: List[str]) -> str:
     return phrase
 
 
-def _clean_title(title: str, url: str) -> str:
-    from urllib.parse import urlparse
-    t = title.strip()
-    host = (urlparse(url).hostname or "").lower()
-    # Amazon: drop leading prefix and trailing department
-    if "amazon." in host:
-        t = re.sub(r"^amazon(?:\.\w+)?\s*:\s*", "", t, flags=re.I)
-        # Drop trailing department segment after colon
-        t = re.sub(r"\s*:\s*[^:]+$", "", t)
-    # Wikipedia: drop trailing site suffix
-    if "wikipedia.org" in host:
-        t = re.sub(r"\s*[\-\–]\s*wikipedia.*$", "", t, flags=re.I)
-    return t.strip()
+def _clean_title(title: str, url: str, profile: Optional[SiteProfile] = None) -> str:
+    # Site prefixes/suffixes (e.g. "Amazon.com :", "- Wikipedia") come from the site profile
+    profile = profile or DEFAULT_REGISTRY.for_url(url)
+    return profile.clean_title(title)
 
 
 
 def _extract_tokens(text: str) -> List[str]:
     # Regex tokenization only; avoids NLTK punkt dependency
-    toks = _TOKEN_RE.findall(text)
+    toks = ENGLISH_TOKEN_RE.findall(text)
     return [t for t in toks if t]
 
 
@@ -118,25 +53,25 @@ def _generate_ngrams(tokens: List[str], n: int) -> Iterable[List[str]]:
         yield tokens[i : i + n]
 
 
-def _is_valid_phrase(tokens: List[str]) -> bool:
+def _is_valid_phrase(tokens: List[str], stopwords: AbstractSet[str] = ENGLISH_STOPWORDS, min_word_len: int = 3, edge_words: AbstractSet[str] = _EDGE_WORDS) -> bool:
     if not tokens:
         return False
     # Drop phrases that are purely numeric
     if all(re.fullmatch(r"\d+(?:\.\d+)?", t) for t in tokens):
         return False
     # Filter stopwords-only phrases and very short tokens
-    if all(t.lower() in _STOPWORDS for t in tokens):
+    if all(t.lower() in stopwords for t in tokens):
         return False
     if all(len(t) <= 1 for t in tokens):
         return False
     # Leading/trailing stop/pronoun tokens reduce quality
     if len(tokens) >= 2:
-        if tokens[0].lower() in _STOPWORDS | _PRONOUNS_DET:
+        if tokens[0].lower() in edge_words:
             return False
-        if tokens[-1].lower() in _STOPWORDS | _PRONOUNS_DET:
+        if tokens[-1].lower() in edge_words:
             return False
         # Drop phrases dominated by stopwords
-        sw_ratio = sum(1 for t in tokens if t.lower() in _STOPWORDS) / len(tokens)
+        sw_ratio = sum(1 for t in tokens if t.lower() in stopwords) / len(tokens)
         if sw_ratio >= 0.5:
             return False
     # Single-word: avoid stop verbs/pronouns and too short
@@ -145,10 +80,10 @@ def _is_valid_phrase(tokens: List[str]) -> bool:
         # Avoid numeric-only single tokens
         if re.fullmatch(r"\d+(?:\.\d+)?", t):
             return False
-        if t in _STOPWORDS or t in _STOP_VERBS or t in _PRONOUNS_DET or len(t) < 3:
+        if t in stopwords or t in STOP_VERBS or t in PRONOUNS_DET or len(t) < min_word_len:
             return False
     # Avoid phrases largely composed of verbs/UI actions
-    if any(t.lower() in _STOP_VERBS for t in tokens):
+    if any(t.lower() in STOP_VERBS for t in tokens):
         return False
     # Allow model numbers like CPT-122
     return True
@@ -178,11 +113,9 @@ def _preprocess_text(text: str, source: str) -> str:
     return t
 
 
-def _is_noise_phrase(phrase: str) -> bool:
+def _is_noise_phrase(phrase: str, profile: SiteProfile = DEFAULT) -> bool:
     p = phrase.lower().strip()
-    if p in _ECOM_NOISE_PHRASES:
-        return True
-    if p in _WIKI_NOISE_PHRASES:
+    if p in profile.noise_phrases:
         return True
     toks = p.split()
     if not toks:
@@ -191,14 +124,15 @@ def _is_noise_phrase(phrase: str) -> bool:
     if re.fullmatch(r"\d+(?:\.\d+)?(?:\s*(?:in|inch|cm|mm|ft))?(?:\s*x\s*\d+(?:\.\d+)?(?:\s*(?:in|inch|cm|mm|ft))?)+\s*(?:in|inch|cm|mm|ft)?", p, flags=re.I):
         return True
     # High ratio of noise tokens
-    noise_ratio = sum(1 for t in toks if t in _ECOM_NOISE_TOKENS or t in _WIKI_NOISE_TOKENS) / len(toks)
+    noise_tokens = profile.noise_tokens
+    noise_ratio = sum(1 for t in toks if t in noise_tokens) / len(toks)
     if noise_ratio >= 0.5:
         return True
     # Keyboard shortcut patterns
     if re.search(r"\bshift\b.*\balt\b|\bctrl\b|\bopt\b", p):
         return True
-    # Drop phrases that include Wikipedia brand markers
-    if "wikipedia" in p or "wikidata" in p or "mediawiki" in p:
+    # Drop phrases that include site brand markers (e.g. Wikipedia)
+    if any(sub in p for sub in profile.noise_substrings):
         return True
     # TOC-like stubs such as "1.2", "1", "2.1.3"
     if re.fullmatch(r"\d+(?:\.\d+)*", p):
@@ -221,20 +155,70 @@ def _is_wiki_toc_item(text: str) -> bool:
     return False
 
 
-def _extract_phrases_from_text(text: str, source: str, max_ngram: int = 3) -> List[Candidate]:
+def _extract_phrases_from_text(text: str, source: str, max_ngram: int = 3, profile: SiteProfile = DEFAULT, lang: str = ENGLISH) -> List[Candidate]:
+    if lang != ENGLISH:
+        return _extract_phrases_multilingual(text, source, max_ngram, profile, get_language(lang))
+    return _extract_phrases_english(text, source, max_ngram, profile)
+
+
+def _extract_phrases_english(text: str, source: str, max_ngram: int = 3, profile: SiteProfile = DEFAULT) -> List[Candidate]:
     pre = _preprocess_text(text, source)
-    tokens = [t for t in _extract_tokens(pre) if t.lower() not in _ECOM_NOISE_TOKENS]
+    drop = profile.drop_tokens
+    tokens = [t for t in _extract_tokens(pre) if t.lower() not in drop]
+    shared = phrase_table().shared
     phrases: List[Candidate] = []
     for n in range(1, max_ngram + 1):
         for ngram in _generate_ngrams(tokens, n):
             if _is_valid_phrase(ngram):
                 norm = _normalize_phrase(ngram)
-                if not _is_noise_phrase(norm):
-                    phrases.append(Candidate(text=norm, source=source))
+                if not _is_noise_phrase(norm, profile):
+                    phrases.append(Candidate(text=shared(norm), source=source))
+    return phrases
+
+
+# CJK pieces up to this many characters are usually one word or compound; longer ones are clauses
+_CJK_WHOLE_PIECE = 6
+
+
+def _extract_phrases_multilingual(text: str, source: str, max_ngram: int, profile: SiteProfile, support: LanguageSupport) -> List[Candidate]:
+    pre = _preprocess_text(text, source)
+    drop = profile.drop_tokens
+    tokens = [t for t in support.tokens(pre) if t.lower() not in drop]
+    stop = support.stopwords
+    # CJK pieces stand alone: short ones whole, longer ones as substrings of up to
+    # max_ngram + 1 characters (n-grams over their bigrams); other tokens are n-grammed as usual
+    segments: List[Tuple[List[str], int]] = []
+    if support.cjk:
+        run: List[str] = []
+        for t in tokens:
+            if CJK_RE.match(t):
+                if run:
+                    segments.append((run, max_ngram))
+                    run = []
+                if len(t) <= _CJK_WHOLE_PIECE:
+                    segments.append(([t], 1))
+                else:
+                    segments.extend(([t[i : i + n]], 1) for n in range(2, max_ngram + 2) for i in range(len(t) - n + 1))
+            else:
+                run.append(t)
+        if run:
+            segments.append((run, max_ngram))
+    else:
+        segments.append((tokens, max_ngram))
+    min_len = 2 if support.cjk else 3
+    shared = phrase_table().shared
+    phrases: List[Candidate] = []
+    for seg, seg_max in segments:
+        for n in range(1, seg_max + 1):
+            for ngram in _generate_ngrams(seg, n):
+                if _is_valid_phrase(ngram, stop, min_len, support.edge_words):
+                    norm = _normalize_phrase(ngram)
+                    if not _is_noise_phrase(norm, profile):
+                        phrases.append(Candidate(text=shared(norm), source=source))
     return phrases
 
 
-def _extract_url_phrases(url: str) -> List[Candidate]:
+def _url_text(url: str) -> str:
     from urllib.parse import urlparse
     parsed = urlparse(url)
     path = parsed.path or ""
@@ -248,98 +232,100 @@ def _extract_url_phrases(url: str) -> List[Candidate]:
             if s.lower() in {"dp","ref","gp","s","bestsellers","bestseller","sr"}:
                 continue
             kept_tokens.extend(re.findall(r"[A-Za-z0-9][A-Za-z0-9\-]+", s))
-    text = " ".join(kept_tokens)
-    return _extract_phrases_from_text(text, source="url")
+    return " ".join(kept_tokens)
+
+
+def _extract_url_phrases(url: str, profile: SiteProfile = DEFAULT) -> List[Candidate]:
+    return _extract_phrases_from_text(_url_text(url), source="url", profile=profile)
+
+
+# When schema.org data already names the entity, body-text sources add cost but little signal
+STRUCTURED_FAST_PATH_CAPS = {
+    "body": 1, "alt": 0, "li": 0, "a": 0, "button": 0, "placeholder": 0, "class": 0, "id": 0,
+}
+
 
+def candidate_sections(content: PageContent, url: str, include_css_topics: bool = False, profile: Optional[SiteProfile] = None, structured_fast_path: bool = True, plan_caps: Optional[Dict[str, int]] = None) -> List[Tuple[str, str]]:
+    """Ordered ``(source, text)`` inputs for phrase extraction, after source-level filtering.
 
-def generate_candidates(content: PageContent, url: str, include_css_topics: bool = False) -> List[Candidate]:
-    candidates: List[Candidate] = []
+    Caps resolve as structured fast path, then the page-type plan (``plan_caps``), then the profile.
+    """
+    profile = profile or DEFAULT_REGISTRY.for_url(url)
+    base_cap = profile.cap
+    if plan_caps:
+        def base_cap(source: str) -> int:
+            return plan_caps.get(source, profile.cap(source))
+    cap = base_cap
+    if structured_fast_path and content.structured.is_rich():
+        def cap(source: str) -> int:
+            return STRUCTURED_FAST_PATH_CAPS.get(source, base_cap(source))
+
+    sections: List[Tuple[str, str]] = []
     # Title and headings
     if content.title:
-        candidates += _extract_phrases_from_text(_clean_title(content.title, url), source="title")
+        sections.append(("title", _clean_title(content.title, url, profile)))
     if content.og_title:
-        candidates += _extract_phrases_from_text(_clean_title(content.og_title, url), source="og")
+        sections.append(("og", _clean_title(content.og_title, url, profile)))
     if content.tw_title:
-        candidates += _extract_phrases_from_text(_clean_title(content.tw_title, url), source="twitter")
-    HEADING_NOISE_SUBSTR = {
-        "feedback","price","product description","product information","options available",
-        "keyboard shortcuts","customers who viewed this item also viewed","similar brands on amazon",
-        "warranty & support","product videos","product guidance & documents","from the manufacturer",
-        "top brand","safety documents","image unavailable","sorry, there was a problem",
-        "product summary","about this item","deals on related products","brands you might like",
-        # Generic wiki headings
-        "personal life","career","early life","references","external links","see also",
-        "bibliography","notes","further reading","works","media","writing","filmography",
-    }
-    for h in content.h_tags[:5]:
+        sections.append(("twitter", _clean_title(content.tw_title, url, profile)))
+    heading_noise = profile.heading_noise
+    for h in content.h_tags[:cap("h")]:
         h_norm = h.strip().lower()
-        if any(substr in h_norm for substr in HEADING_NOISE_SUBSTR):
+        if any(substr in h_norm for substr in heading_noise):
             continue
-        candidates += _extract_phrases_from_text(h, source="h")
+        sections.append(("h", h))
 
     # Early paragraphs only
-    for p in content.paragraphs[:6]:
-        candidates += _extract_phrases_from_text(p, source="body")
+    sections.extend(("body", p) for p in content.paragraphs[:cap("body")])
 
     # Product bullets and specs (high-signal for products)
-    for b in getattr(content, "bullets", [])[:12]:
-        candidates += _extract_phrases_from_text(b, source="bullet")
-    for s in getattr(content, "specs", [])[:20]:
-        candidates += _extract_phrases_from_text(s, source="spec")
+    sections.extend(("bullet", b) for b in getattr(content, "bullets", [])[:cap("bullet")])
+    sections.extend(("spec", s) for s in getattr(content, "specs", [])[:cap("spec")])
 
     # Meta description
-    if content.meta_description and not re.search(r"amazon|online shopping", content.meta_description, re.I):
-        candidates += _extract_phrases_from_text(content.meta_description, source="meta")
+    meta_skip = profile.meta_skip_re
+    if content.meta_description and not (meta_skip and meta_skip.search(content.meta_description)):
+        sections.append(("meta", content.meta_description))
     if content.og_description:
-        candidates += _extract_phrases_from_text(content.og_description, source="og")
+        sections.append(("og", content.og_description))
     if content.tw_description:
-        candidates += _extract_phrases_from_text(content.tw_description, source="twitter")
+        sections.append(("twitter", content.tw_description))
 
     # Image alts (cap)
-    for alt in content.images_alt[:10]:
-        candidates += _extract_phrases_from_text(alt, source="alt")
+    sections.extend(("alt", alt) for alt in content.images_alt[:cap("alt")])
 
     # List items and anchor texts for sparse pages
-    for li in content.list_items[:20]:
-        if _is_wiki_toc_item(li):
-            continue
-        candidates += _extract_phrases_from_text(li, source="li")
-    for a in content.anchor_texts[:30]:
-        if _is_wiki_toc_item(a):
-            continue
-        candidates += _extract_phrases_from_text(a, source="a")
-    for b in content.button_texts[:10]:
-        candidates += _extract_phrases_from_text(b, source="button")
-    for ph in content.input_placeholders[:10]:
-        candidates += _extract_phrases_from_text(ph, source="placeholder")
+    sections.extend(("li", li) for li in content.list_items[:cap("li")] if not _is_wiki_toc_item(li))
+    sections.extend(("a", a) for a in content.anchor_texts[:cap("a")] if not _is_wiki_toc_item(a))
+    sections.extend(("button", b) for b in content.button_texts[:cap("button")])
+    sections.extend(("placeholder", ph) for ph in content.input_placeholders[:cap("placeholder")])
 
     # Non-tailwind semantic classes can hint at topics on sparse pages
     if include_css_topics:
-        for css in content.semantic_classes[:20]:
+        for css in content.semantic_classes[:cap("class")]:
             # Convert kebab/camel to space-separated words
             text = re.sub(r"[-_]+", " ", css)
             text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
-            candidates += _extract_phrases_from_text(text, source="class")
-        for ident in content.semantic_ids[:10]:
+            sections.append(("class", text))
+        for ident in content.semantic_ids[:cap("id")]:
             text = re.sub(r"[-_]+", " ", ident)
             text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
-            candidates += _extract_phrases_from_text(text, source="id")
+            sections.append(("id", text))
 
     # URL path tokens (cleaned)
-    candidates += _extract_url_phrases(url)
-
-    # JSON-LD raw text (very limited)
-    for j in content.json_ld[:2]:
-        candidates += _extract_phrases_from_text(j, source="jsonld")
-
-    # Deduplicate
-    seen = set()
-    unique: List[Candidate] = []
-    for c in candidates:
-        key = c.text
-        if key not in seen:
-            seen.add(key)
-            unique.append(c)
-    return unique
-
-
+    sections.append(("url", _url_text(url)))
+
+    # Schema.org fields (JSON-LD/microdata): product name, brand, model, headline, keywords, about
+    sections.extend(("jsonld", j) for j in content.json_ld[:cap("jsonld")])
+    return sections
+
+
+def generate_candidates(content: PageContent, url: str, include_css_topics: bool = False, profile: Optional[SiteProfile] = None, structured_fast_path: bool = True, plan_caps: Optional[Dict[str, int]] = None, lang: str = ENGLISH) -> List[Candidate]:
+    profile = profile or DEFAULT_REGISTRY.for_url(url)
+    # Deduplicate as phrases are produced rather than holding every n-gram
+    unique: Dict[str, Candidate] = {}
+    for source, text in candidate_sections(content, url, include_css_topics, profile, structured_fast_path, plan_caps):
+        for c in _extract_phrases_from_text(text, source=source, profile=profile, lang=lang):
+            if c.text not in unique:
+                unique[c.text] = c
+    return list(unique.values())
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import codecs
+import re
+from typing import Optional, Tuple
+
+import chardet
+
+
+# Layered detection, cheapest and most authoritative first:
+# BOM → HTTP charset → <meta> sniff → strict UTF-8 → chardet on a bounded prefix.
+META_SNIFF_BYTES = 4096
+DETECT_PREFIX_BYTES = 32 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_HTTP_CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+
+# Labels browsers treat as windows-1252 (WHATWG encoding spec)
+_LABEL_ALIASES = {
+    "ascii": "cp1252",
+    "us-ascii": "cp1252",
+    "iso-8859-1": "cp1252",
+    "iso8859-1": "cp1252",
+    "latin1": "cp1252",
+    "latin-1": "cp1252",
+}
+
+
+def _normalize_label(label: Optional[str]) -> Optional[str]:
+    if not label:
+        return None
+    name = label.strip().strip("\"'").lower()
+    name = _LABEL_ALIASES.get(name, name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def http_charset(content_type: str) -> Optional[str]:
+    m = _HTTP_CHARSET_RE.search(content_type or "")
+    return _normalize_label(m.group(1)) if m else None
+
+
+def sniff_meta_charset(raw: bytes) -> Optional[str]:
+    m = _META_CHARSET_RE.search(raw[:META_SNIFF_BYTES])
+    if not m:
+        return None
+    enc = _normalize_label(m.group(1).decode("ascii", errors="ignore"))
+    # A <meta> claiming UTF-16 was necessarily read as ASCII-compatible bytes
+    if enc and enc.startswith("utf-16"):
+        return "utf-8"
+    return enc
+
+
+def _detect(raw: bytes, content_type: str) -> Tuple[str, str, Optional[str]]:
+    # Also hands back the text when the strict UTF-8 probe already decoded it
+    for bom, enc in _BOMS:
+        if raw.startswith(bom):
+            return enc, "bom", None
+
+    enc = http_charset(content_type)
+    if enc:
+        return enc, "http", None
+
+    enc = sniff_meta_charset(raw)
+    if enc:
+        return enc, "meta", None
+
+    try:
+        return "utf-8", "utf-8", raw.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+
+    guess = chardet.detect(raw[:DETECT_PREFIX_BYTES]).get("encoding") if raw else None
+    enc = _normalize_label(guess)
+    if enc:
+        return enc, "chardet", None
+    return "utf-8", "default", None
+
+
+def detect_encoding(raw: bytes, content_type: str = "") -> Tuple[str, str]:
+    """Return ``(encoding, method)`` for an HTML body."""
+    enc, method, _ = _detect(raw, content_type)
+    return enc, method
+
+
+def decode_html(raw: bytes, content_type: str = "") -> Tuple[str, str, str]:
+    """Decode an HTML body, returning ``(text, encoding, method)``."""
+    enc, method, text = _detect(raw, content_type)
+    if text is None:
+        text = raw.decode(enc, errors="replace")
+    return text, enc, method
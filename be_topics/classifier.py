@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict
+from typing import Dict, List
 
 from .parser import PageContent
+from .structured import NEWS_TYPES
 
 
 class PageType(str, Enum):
@@ -14,25 +16,96 @@ class PageType(str, Enum):
     OTHER = "other"
 
 
-def classify_page(content: PageContent) -> PageType:
-    t = " ".join([content.title] + content.h_tags[:1] + content.paragraphs[:2]).lower()
+# One pass over the lead text; each named group is a signal. Only the byline is case-sensitive.
+_LEAD_RE = re.compile(
+    r"(?P<commerce>(?i:\badd to cart\b|\bbuy now\b|\bsku\b|\bmodel\b|\bprice\b))"
+    r"|(?P<price>\$\s?\d+(?:[.,]\d{2})?)"
+    r"|(?P<news>(?i:\bnews\b|\bbreaking\b|\bcnn\b|\bassociated press\b))"
+    r"|(?P<byline>\b[Bb]y [A-Z][a-z]+\b)"
+)
+_CART_RE = re.compile(r"\badd to (?:cart|basket|bag)\b|\bbuy now\b", re.I)
+
+# Evidence weights per page type; OTHER wins when nothing else adds up
+_WEIGHTS: Dict[PageType, Dict[str, float]] = {
+    PageType.PRODUCT: {
+        "structured_product": 3.0, "price": 2.0, "cart": 2.0, "commerce": 1.5,
+        "bullets": 1.0, "specs": 1.0, "og_product": 1.5,
+    },
+    PageType.NEWS: {
+        "structured_news": 3.0, "news": 2.5, "byline": 0.75, "author": 0.5, "og_article": 0.5,
+    },
+    PageType.ARTICLE: {
+        "structured_article": 2.5, "long_lead": 2.0, "og_article": 1.0, "byline": 0.75, "author": 0.75,
+    },
+    PageType.OTHER: {},
+}
+_OTHER_PRIOR = 1.0
+_TIE_ORDER = (PageType.OTHER, PageType.ARTICLE, PageType.NEWS, PageType.PRODUCT)
+
+
+@dataclass
+class PageFeatures:
+    """Classification signals, derived from fields parse_content already produced."""
+    signals: List[str] = field(default_factory=list)
+    lead_words: int = 0
+
+    def has(self, name: str) -> bool:
+        return name in self.signals
 
-    # Product signals
-    product_signals = [
-        re.search(r"\badd to cart\b|\bbuy now\b|\bsku\b|\bmodel\b|\bprice\b", t),
-        re.search(r"\$\s?\d+(?:[.,]\d{2})?", t),
-    ]
-    if any(product_signals):
-        return PageType.PRODUCT
 
-    # News signals
-    if re.search(r"\bnews\b|\bbreaking\b|\bcnn\b|\bassociated press\b|\bby [A-Z][a-z]+\b", t):
-        return PageType.NEWS
+@dataclass
+class Classification:
+    page_type: PageType
+    confidence: float
+    scores: Dict[str, float]
+    features: PageFeatures
 
-    # Article/blog signals
-    if len(" ".join(content.paragraphs[:3]).split()) > 60:
-        return PageType.ARTICLE
 
-    return PageType.OTHER
+def extract_features(content: PageContent) -> PageFeatures:
+    lead = " ".join([content.title] + content.h_tags[:1] + content.paragraphs[:2])
+    signals = {m.lastgroup for m in _LEAD_RE.finditer(lead)}
+    lead_words = sum(len(p.split()) for p in content.paragraphs[:3])
+    if lead_words > 60:
+        signals.add("long_lead")
+    # A "$" amount anywhere in the body is not evidence; the lead regex and price selectors are
+    if content.price_tagged:
+        signals.add("price")
+    if any(_CART_RE.search(b) for b in content.button_texts[:20]):
+        signals.add("cart")
+    if len(content.bullets) >= 3:
+        signals.add("bullets")
+    if len(content.specs) >= 3:
+        signals.add("specs")
+    if content.author:
+        signals.add("author")
+    sd = content.structured
+    if sd.is_product:
+        signals.add("structured_product")
+    if sd.is_article:
+        signals.add("structured_article")
+    if any(t in NEWS_TYPES for t in sd.types):
+        signals.add("structured_news")
+    if content.og_type.startswith("product"):
+        signals.add("og_product")
+    elif content.og_type == "article":
+        signals.add("og_article")
+    return PageFeatures(signals=sorted(signals), lead_words=lead_words)
 
 
+def classify_features(features: PageFeatures) -> Classification:
+    scores: Dict[str, float] = {}
+    for page_type, weights in _WEIGHTS.items():
+        scores[page_type.value] = sum(w for name, w in weights.items() if features.has(name))
+    scores[PageType.OTHER.value] = _OTHER_PRIOR
+    # Ties go to the type whose plan skips least: other, then article, news, product
+    best = max(_TIE_ORDER, key=lambda t: scores[t.value])
+    confidence = scores[best.value] / sum(scores.values())
+    return Classification(page_type=best, confidence=round(confidence, 3), scores=scores, features=features)
+
+
+def classify(content: PageContent) -> Classification:
+    return classify_features(extract_features(content))
+
+
+def classify_page(content: PageContent) -> PageType:
+    return classify(content).page_type
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from .parser import PageContent
+from .profiles import DEFAULT_REGISTRY, ProfileRegistry
+
+
+# Tracking parameters that never change page content, on any site
+TRACKING_PARAMS = {
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "mc_cid", "mc_eid", "igshid",
+    "_ga", "_gl", "spm", "scid", "cmpid", "srsltid",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_", "oly_")
+MOBILE_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+
+_TOKEN_RE = re.compile(r"\w+")
+_SHINGLE = 3
+_MIN_TOKENS = 40  # shorter pages are too small for a stable SimHash
+_MAX_SHINGLES = 4000
+_BANDS = 4  # 4 x 16-bit bands: any pair within Hamming distance 3 shares a band
+
+
+def canonicalize_url(url: str, profiles: Optional[ProfileRegistry] = None) -> str:
+    """Normalize a URL so mirrored, mobile and parameterized variants compare equal."""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or "").lower().rstrip(".")
+    for prefix in MOBILE_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    port = parsed.port
+    if port and not ((parsed.scheme == "http" and port == 80) or (parsed.scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    profile = (profiles or DEFAULT_REGISTRY).lookup(parsed.hostname or "")
+    # Amazon-style "/ref=sr_1_1" path segments carry tracking only
+    segs = [s for s in parsed.path.split("/") if s and not s.lower().startswith("ref=")]
+    path = "/" + "/".join(segs)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS
+        and not k.lower().startswith(TRACKING_PREFIXES)
+        and not profile.ignores_param(k)
+    )
+    # Scheme is dropped on purpose: http/https variants are the same page
+    return urlunparse(("", host, path, "", urlencode(query), ""))[2:]
+
+
+def simhash(tokens: Iterable[str]) -> int:
+    """64-bit SimHash over word 3-shingles."""
+    toks = list(tokens)
+    weights = [0] * 64
+    n = 0
+    for i in range(min(len(toks) - _SHINGLE + 1, _MAX_SHINGLES)):
+        shingle = " ".join(toks[i : i + _SHINGLE]).encode("utf-8")
+        h = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big")
+        n += 1
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    if not n:
+        return 0
+    out = 0
+    for bit, w in enumerate(weights):
+        if w > 0:
+            out |= 1 << bit
+    return out
+
+
+def content_simhash(content: PageContent) -> Optional[int]:
+    """SimHash of the main-block text (headings + paragraphs), or None if too short."""
+    tokens: List[str] = []
+    for text in (*content.h_tags, *content.paragraphs):
+        tokens.extend(t.lower() for t in _TOKEN_RE.findall(text))
+        if len(tokens) >= _MAX_SHINGLES:
+            break
+    if len(tokens) < _MIN_TOKENS:
+        return None
+    return simhash(tokens)
+
+
+@dataclass
+class DedupStats:
+    pages: int = 0
+    url_hits: int = 0
+    canonical_hits: int = 0
+    near_hits: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        hits = self.url_hits + self.canonical_hits + self.near_hits
+        return {
+            "pages": self.pages,
+            "url_hits": self.url_hits,
+            "canonical_hits": self.canonical_hits,
+            "near_duplicate_hits": self.near_hits,
+            "hit_rate": round(hits / self.pages, 4) if self.pages else 0.0,
+        }
+
+
+class DuplicateIndex:
+    """Canonical-URL and SimHash index over results computed in a batch.
+
+    Holds at most ``max_entries`` results; the oldest are evicted first.
+    """
+
+    def __init__(self, max_distance: int = 3, max_entries: int = 100_000, profiles: Optional[ProfileRegistry] = None) -> None:
+        if not 0 <= max_distance < _BANDS:
+            # Pigeonhole: more differing bits than bands can spread over every band and miss the lookup
+            raise ValueError(f"max_distance must be between 0 and {_BANDS - 1}, got {max_distance}")
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.profiles = profiles
+        self.stats = DedupStats()
+        self._results: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._by_url: Dict[str, int] = {}
+        self._bands: List[Dict[int, List[Tuple[int, int]]]] = [{} for _ in range(_BANDS)]
+        self._keys: Dict[int, Tuple[List[str], Optional[int]]] = {}
+        self._next_id = 0
+
+    def canonical(self, url: str) -> str:
+        return canonicalize_url(url, self.profiles)
+
+    def _get(self, rid: Optional[int]) -> Optional[Dict[str, Any]]:
+        return self._results.get(rid) if rid is not None else None
+
+    def lookup_url(self, *urls: str) -> Optional[Dict[str, Any]]:
+        for url in urls:
+            if url:
+                hit = self._get(self._by_url.get(self.canonical(url)))
+                if hit is not None:
+                    return hit
+        return None
+
+    def lookup_near(self, h: Optional[int]) -> Optional[Dict[str, Any]]:
+        if h is None:
+            return None
+        for band, table in enumerate(self._bands):
+            key = (h >> (band * 16)) & 0xFFFF
+            for other, rid in table.get(key, ()):
+                if bin(h ^ other).count("1") <= self.max_distance and rid in self._results:
+                    return self._results[rid]
+        return None
+
+    def add(self, result: Dict[str, Any], urls: Iterable[str], h: Optional[int]) -> None:
+        rid = self._next_id
+        self._next_id += 1
+        self._results[rid] = result
+        keys = [self.canonical(url) for url in urls if url]
+        for key in keys:
+            self._by_url[key] = rid
+        if h is not None:
+            for band, table in enumerate(self._bands):
+                table.setdefault((h >> (band * 16)) & 0xFFFF, []).append((h, rid))
+        self._keys[rid] = (keys, h)
+        while len(self._results) > self.max_entries:
+            self._evict(self._results.popitem(last=False)[0])
+
+    def _evict(self, rid: int) -> None:
+        keys, h = self._keys.pop(rid, ([], None))
+        for key in keys:
+            if self._by_url.get(key) == rid:
+                del self._by_url[key]
+        if h is not None:
+            for band, table in enumerate(self._bands):
+                bkey = (h >> (band * 16)) & 0xFFFF
+                entries = [e for e in table.get(bkey, ()) if e[1] != rid]
+                if entries:
+                    table[bkey] = entries
+                else:
+                    table.pop(bkey, None)
+
+
+def reuse(result: Dict[str, Any], url: str, kind: str) -> Dict[str, Any]:
+    """A previously computed result re-labelled for a duplicate URL."""
+    return {**result, "url": url, "duplicate_of": result.get("url"), "dedup": kind}
+
+
+def resolve_canonical(page_url: str, canonical_href: str) -> str:
+    return urljoin(page_url, canonical_href) if canonical_href else ""
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import time
-from dataclasses import dataclass
-from typing import Optional, Tuple
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse, urlunparse
 from urllib import robotparser
 
-import chardet
 import requests
+import tldextract
+
+from .charset import decode_html
 
 
 DEFAULT_HEADERS = {
@@ -25,6 +27,10 @@ class FetchResult:
     content_type: str
     text: Optional[str]
     error: Optional[str] = None
+    encoding: Optional[str] = None
+    encoding_method: Optional[str] = None  # bom, http, meta, utf-8, chardet, default
+    content_language: Optional[str] = None  # Content-Language header, if any
+    render: Optional[Dict[str, Any]] = None  # RenderStats for rendered fetches
 
 
 def is_fetch_allowed(url: str, user_agent: str) -> Tuple[bool, str]:
@@ -41,31 +47,195 @@ def is_fetch_allowed(url: str, user_agent: str) -> Tuple[bool, str]:
     return allowed, robots_url
 
 
-def _render_with_playwright(url: str, timeout: float) -> Tuple[str, str, int]:
+# Analytics, ad and session-replay endpoints; matched as substrings of the request URL
+TRACKER_PATTERNS: Tuple[str, ...] = (
+    "google-analytics.com", "googletagmanager.com", "googleadservices.com", "googlesyndication.com",
+    "doubleclick.net", "adservice.google.", "facebook.net", "connect.facebook.", "analytics.tiktok.com",
+    "amazon-adsystem.com", "scorecardresearch.com", "quantserve.com", "hotjar.com", "clarity.ms",
+    "segment.io", "cdn.segment.com", "mixpanel.com", "newrelic.com", "nr-data.net", "optimizely.com",
+    "criteo.", "taboola.com", "outbrain.com", "bat.bing.com", "adsrvr.org", "krxd.net", "/beacon", "/collect?",
+)
+# Resource types that never carry page text
+_ASSET_TYPES = {"image", "media", "font"}
+
+
+@dataclass
+class RenderOptions:
+    wait: str = "ready"  # ready (content settled) | networkidle | load
+    settle_ms: int = 500  # quiet window: no DOM mutations and unchanged title/main text
+    block_trackers: bool = True
+    block_assets: bool = True  # images, media and fonts
+    block_third_party: bool = False  # scripts/XHR from other sites (can break CDN-hosted apps)
+    block_patterns: Tuple[str, ...] = TRACKER_PATTERNS
+    main_only: bool = False  # serialize <head> + main block instead of the whole document
+
+
+@dataclass
+class RenderStats:
+    seconds: float = 0.0
+    ready_seconds: float = 0.0  # navigation start → content ready
+    outcome: str = ""  # ready | timeout | networkidle | load
+    requests: int = 0
+    blocked: int = 0
+    bytes: int = 0  # response headers + bodies of finished requests, as transferred
+    html_bytes: int = 0
+    main_only: bool = False
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out["seconds"] = round(self.seconds, 3)
+        out["ready_seconds"] = round(self.ready_seconds, 3)
+        return out
+
+
+# Resolves once the DOM has been quiet for `settle` ms and title + main text length
+# are unchanged between two quiet checks, or with "timeout" at `deadline`
+_READY_JS = """([settle, deadline]) => new Promise(resolve => {
+  const start = performance.now();
+  let lastMutation = start, lastSig = null;
+  const obs = new MutationObserver(() => { lastMutation = performance.now(); });
+  obs.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+  const main = () => document.querySelector('main, [role=main], article') || document.body;
+  const tick = () => {
+    const now = performance.now();
+    if (now - start > deadline) { obs.disconnect(); resolve('timeout'); return; }
+    if (now - lastMutation >= settle) {
+      const el = main();
+      const len = el ? el.textContent.trim().length : 0;
+      const sig = document.title + '|' + len;
+      if (len > 0 && sig === lastSig) { obs.disconnect(); resolve('ready'); return; }
+      lastSig = sig;
+    }
+    setTimeout(tick, 100);
+  };
+  tick();
+})"""
+
+# <head> without scripts/styles (JSON-LD kept, including any from <body>), headings
+# outside the main block, then the main block itself. null when no main block is found
+_MAIN_ONLY_JS = """() => {
+  let el = null;
+  for (const sel of ['main', '[role=main]', 'article', '#main', '#content']) {
+    el = document.querySelector(sel);
+    if (el && el.textContent.trim().length >= 200) break;
+    el = null;
+  }
+  if (!el) return null;
+  const head = document.head ? document.head.cloneNode(true) : document.createElement('head');
+  head.querySelectorAll('script:not([type="application/ld+json"]), style, link[rel=stylesheet], noscript').forEach(n => n.remove());
+  document.querySelectorAll('body script[type="application/ld+json"]').forEach(n => head.appendChild(n.cloneNode(true)));
+  const headings = [...document.querySelectorAll('h1, h2')].filter(h => !el.contains(h)).map(h => h.outerHTML).join('');
+  const lang = (document.documentElement.getAttribute('lang') || '').replace(/"/g, '');
+  return '<!DOCTYPE html><html' + (lang ? ' lang="' + lang + '"' : '') + '>' + head.outerHTML + '<body>' + headings + el.outerHTML + '</body></html>';
+}"""
+
+
+# The public suffix list snapshot bundled with tldextract: no network fetch from a render
+_TLD_EXTRACT = tldextract.TLDExtract(suffix_list_urls=())
+
+
+def _site_suffix(host: str) -> str:
+    # www.dw.de → dw.de, shop.example.co.uk → example.co.uk; IPs and bare hosts stay whole
+    host = host.lower()
+    return _TLD_EXTRACT(host).top_domain_under_public_suffix or host
+
+
+def _should_block(request_url: str, resource_type: str, page_site: str, options: RenderOptions) -> bool:
+    if options.block_assets and resource_type in _ASSET_TYPES:
+        return True
+    if options.block_trackers and any(p in request_url for p in options.block_patterns):
+        return True
+    if options.block_third_party and resource_type in ("script", "xhr", "fetch", "websocket", "eventsource"):
+        host = (urlparse(request_url).hostname or "").lower()
+        return not (host == page_site or host.endswith("." + page_site))
+    return False
+
+
+def _render_with_playwright(url: str, timeout: float, options: Optional[RenderOptions] = None) -> Tuple[str, str, int, Optional[str], RenderStats]:
     try:
         from playwright.sync_api import sync_playwright  # type: ignore
     except Exception as e:
         raise RuntimeError("playwright not installed; run `pip install playwright` and `playwright install chromium`") from e
 
-    with sync_playwright() as p:  # type: ignore
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(user_agent=DEFAULT_HEADERS["User-Agent"], locale="en-US")
-        page = context.new_page()
-        resp = page.goto(url, wait_until="load", timeout=int(timeout * 1000))
-        # Wait for network to be idle briefly
+    options = options or RenderOptions()
+    stats = RenderStats(main_only=options.main_only)
+    page_site = _site_suffix(urlparse(url).hostname or "")
+    budget_ms = int(timeout * 1000)
+    started = time.monotonic()
+
+    def remaining_ms() -> int:
+        return max(1, budget_ms - int((time.monotonic() - started) * 1000))
+
+    def on_request(request: Any) -> None:
+        stats.requests += 1
+
+    def on_route(route: Any) -> None:
+        request = route.request
+        if _should_block(request.url, request.resource_type, page_site, options):
+            stats.blocked += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    def on_request_finished(request: Any) -> None:
+        # Content-Length is absent for chunked/compressed responses; sizes() has what crossed the wire
         try:
-            page.wait_for_load_state("networkidle", timeout=int(timeout * 1000))
+            sizes = request.sizes()
+            stats.bytes += max(0, sizes["responseBodySize"]) + max(0, sizes["responseHeadersSize"])
         except Exception:
             pass
-        html = page.content()
-        final_url = page.url
-        status = resp.status if resp else 200
-        context.close()
-        browser.close()
-        return final_url, html, status
+
+    with sync_playwright() as p:  # type: ignore
+        browser = p.chromium.launch(headless=True)
+        try:
+            context = browser.new_context(user_agent=DEFAULT_HEADERS["User-Agent"], locale="en-US")
+            page = context.new_page()
+            page.set_default_timeout(budget_ms)
+            if options.block_trackers or options.block_assets or options.block_third_party:
+                page.route("**/*", on_route)
+            page.on("request", on_request)
+            page.on("requestfinished", on_request_finished)
+            # "ready" only needs the DOM; the content check below decides when to stop
+            resp = page.goto(url, wait_until="domcontentloaded" if options.wait == "ready" else "load", timeout=budget_ms)
+            if options.wait == "ready":
+                try:
+                    stats.outcome = page.evaluate(_READY_JS, [options.settle_ms, remaining_ms()])
+                except Exception as e:
+                    # Client-side redirects destroy the execution context mid-wait
+                    stats.errors.append(f"ready-check: {e}")
+                    stats.outcome = "timeout"
+            elif options.wait == "networkidle":
+                try:
+                    page.wait_for_load_state("networkidle", timeout=remaining_ms())
+                    stats.outcome = "networkidle"
+                except Exception:
+                    stats.outcome = "timeout"
+            else:
+                stats.outcome = "load"
+            stats.ready_seconds = time.monotonic() - started
+            html = None
+            if options.main_only:
+                try:
+                    html = page.evaluate(_MAIN_ONLY_JS)
+                except Exception as e:
+                    stats.errors.append(f"main-only: {e}")
+                if html is None:
+                    stats.main_only = False
+            if html is None:
+                html = page.content()
+            final_url = page.url
+            status = resp.status if resp else 200
+            content_language = resp.headers.get("content-language") if resp else None
+            context.close()
+        finally:
+            browser.close()
+    stats.html_bytes = len(html.encode("utf-8"))
+    stats.seconds = time.monotonic() - started
+    return final_url, html, status, content_language, stats
 
 
-def fetch_url(url: str, timeout: float = 8.0, max_retries: int = 2, respect_robots: bool = True, render: bool = False) -> FetchResult:
+def fetch_url(url: str, timeout: float = 8.0, max_retries: int = 2, respect_robots: bool = True, render: bool = False, render_options: Optional[RenderOptions] = None) -> FetchResult:
     session = requests.Session()
     session.headers.update(DEFAULT_HEADERS)
 
@@ -76,8 +246,8 @@ def fetch_url(url: str, timeout: float = 8.0, max_retries: int = 2, respect_robo
 
     if render:
         try:
-            final_url, html, status = _render_with_playwright(url, timeout=timeout)
-            return FetchResult(url=final_url, status_code=status, content_type="text/html", text=html)
+            final_url, html, status, content_language, stats = _render_with_playwright(url, timeout=timeout, options=render_options)
+            return FetchResult(url=final_url, status_code=status, content_type="text/html", text=html, content_language=content_language, render=stats.to_dict())
         except Exception as e:
             return FetchResult(url=url, status_code=0, content_type="", text=None, error=f"render-failed: {e}")
 
@@ -102,11 +272,10 @@ def fetch_url(url: str, timeout: float = 8.0, max_retries: int = 2, respect_robo
                 if resp.status_code >= 400:
                     return FetchResult(url=url, status_code=resp.status_code, content_type=ctype, text=None, error="HTTP error on GET")
 
-                # Decode content
-                raw = resp.content
-                enc = resp.encoding or (chardet.detect(raw)["encoding"] if raw else None) or "utf-8"
-                text = raw.decode(enc, errors="replace")
-                return FetchResult(url=resp.url, status_code=resp.status_code, content_type=ctype, text=text)
+                # Decode content; resp.encoding is skipped on purpose since requests
+                # reports ISO-8859-1 for any text/* response without a charset
+                text, enc, method = decode_html(resp.content, ctype)
+                return FetchResult(url=resp.url, status_code=resp.status_code, content_type=ctype, text=text, encoding=enc, encoding_method=method, content_language=resp.headers.get("Content-Language"))
             except requests.RequestException as e:
                 last_exc = e
                 if attempt < max_retries:
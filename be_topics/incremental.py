@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .candidates import Candidate, _extract_phrases_from_text
+from .language import ENGLISH
+from .profiles import SiteProfile
+
+
+def fingerprint(*parts: str) -> str:
+    h = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        h.update(part.encode("utf-8", errors="surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+@dataclass
+class PageState:
+    """What a previous run needs to keep to make the next one incremental."""
+    url: str
+    page_fingerprint: str
+    settings: str  # profile/options the sections were tokenized under
+    result: Dict[str, Any]
+    top_k: int = 0
+    # section fingerprint → [[phrase, source], ...] in generation order
+    sections: Dict[str, List[List[str]]] = field(default_factory=dict)
+
+
+@dataclass
+class IncrementalStats:
+    sections: int = 0
+    reused: int = 0
+    retokenized: int = 0
+    unchanged_page: bool = False
+
+
+def merge_sections(
+    sections: List[Tuple[str, str]],
+    profile: SiteProfile,
+    previous: Optional[PageState],
+    lang: str = ENGLISH,
+) -> Tuple[List[Candidate], Dict[str, List[List[str]]], IncrementalStats]:
+    """Rebuild the page's candidate list, tokenizing only sections whose fingerprint changed.
+
+    Merging keeps the first occurrence of each phrase in section order, which is
+    exactly what generate_candidates produces for the same sections.
+    """
+    known = previous.sections if previous is not None else {}
+    stats = IncrementalStats(sections=len(sections))
+    unique: Dict[str, Candidate] = {}
+    fresh: Dict[str, List[List[str]]] = {}
+    for source, text in sections:
+        # English keeps its original fingerprints; other languages tokenize differently
+        fp = fingerprint(source, text) if lang == ENGLISH else fingerprint(lang, source, text)
+        phrases = fresh.get(fp)
+        if phrases is None:
+            phrases = known.get(fp)
+        if phrases is None:
+            phrases = [[c.text, c.source] for c in _extract_phrases_from_text(text, source=source, profile=profile, lang=lang)]
+            stats.retokenized += 1
+        else:
+            stats.reused += 1
+        fresh[fp] = phrases
+        for phrase, src in phrases:
+            if phrase not in unique:
+                unique[phrase] = Candidate(text=phrase, source=src)
+    return list(unique.values()), fresh, stats
+
+
+class StateStore:
+    """Per-URL PageState kept in a JSON file between runs."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._states: Dict[str, PageState] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fh:
+                for url, data in json.load(fh).items():
+                    self._states[url] = PageState(**data)
+
+    def get(self, url: str) -> Optional[PageState]:
+        return self._states.get(url)
+
+    def put(self, state: PageState) -> None:
+        self._states[state.url] = state
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({url: asdict(s) for url, s in self._states.items()}, fh, ensure_ascii=False)
+        os.replace(tmp, self.path)
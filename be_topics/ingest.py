@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import gzip
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, Optional, Tuple, Union
+import zlib
+
+from .charset import decode_html
+from .fetcher import FetchResult
+
+
+HTML_SUFFIXES = {".html", ".htm", ".xhtml"}
+WARC_SUFFIXES = (".warc", ".warc.gz")
+
+# How much of a saved page we look at to recover its original URL
+_SNIFF_BYTES = 8192
+_SAVED_FROM_RE = re.compile(rb"<!--\s*saved from url=\(\d+\)\s*(\S+?)\s*-->", re.I)
+_CANONICAL_RE = re.compile(rb"<link[^>]+rel=[\"']?canonical[\"']?[^>]*>", re.I)
+_OG_URL_RE = re.compile(rb"<meta[^>]+property=[\"']?og:url[\"']?[^>]*>", re.I)
+_HREF_RE = re.compile(rb"(?:href|content)=[\"']([^\"']+)[\"']", re.I)
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def _map_file(path: Path) -> Optional[mmap.mmap]:
+    # Zero-length files cannot be mapped; callers treat them as empty
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _file_error(path: Path, error: str) -> FetchResult:
+    return FetchResult(url=path.resolve().as_uri(), status_code=0, content_type="", text=None, error=error)
+
+
+def _parse_headers(lines: Iterable[bytes]) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    for line in lines:
+        name, sep, value = line.partition(b":")
+        if sep:
+            headers[name.strip().decode("latin-1").lower()] = value.strip().decode("latin-1")
+    return headers
+
+
+def _dechunk(body: bytes) -> bytes:
+    out = bytearray()
+    pos = 0
+    while pos < len(body):
+        eol = body.find(b"\r\n", pos)
+        if eol < 0:
+            break
+        try:
+            size = int(body[pos:eol].split(b";", 1)[0], 16)
+        except ValueError:
+            # Not actually chunked; keep what we have
+            return body
+        if size == 0:
+            break
+        start = eol + 2
+        out += body[start : start + size]
+        pos = start + size + 2
+    return bytes(out)
+
+
+def _split_http_response(block: bytes) -> Tuple[int, Dict[str, str], bytes]:
+    head, sep, body = block.partition(b"\r\n\r\n")
+    if not sep:
+        head, sep, body = block.partition(b"\n\n")
+    lines = head.splitlines()
+    status = 0
+    if lines:
+        parts = lines[0].split()
+        if len(parts) >= 2 and parts[1].isdigit():
+            status = int(parts[1])
+    headers = _parse_headers(lines[1:])
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        body = _dechunk(body)
+    encoding = headers.get("content-encoding", "").lower()
+    try:
+        if encoding in ("gzip", "x-gzip"):
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+    except (OSError, zlib.error):
+        pass
+    return status, headers, body
+
+
+def _is_html(content_type: str) -> bool:
+    ctype = content_type.lower()
+    return not ctype or "text/html" in ctype or "application/xhtml+xml" in ctype
+
+
+def _iter_warc_stream(stream: IO[bytes]) -> Iterator[FetchResult]:
+    while True:
+        line = stream.readline()
+        if not line:
+            return
+        if not line.startswith(b"WARC/"):
+            continue
+        header_lines = []
+        while True:
+            hl = stream.readline()
+            if not hl or hl in (b"\r\n", b"\n"):
+                break
+            header_lines.append(hl)
+        headers = _parse_headers(header_lines)
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            length = 0
+        block = stream.read(length)
+
+        record_type = headers.get("warc-type", "").lower()
+        url = headers.get("warc-target-uri", "").strip("<>")
+        if not url or record_type not in ("response", "resource"):
+            continue
+        if record_type == "response":
+            if not headers.get("content-type", "").lower().startswith("application/http"):
+                continue
+            status, http_headers, body = _split_http_response(block)
+            ctype = http_headers.get("content-type", "")
+        else:
+            status, http_headers, body = 200, {}, block
+            ctype = headers.get("content-type", "")
+        if status >= 400 or not _is_html(ctype):
+            continue
+        text, enc, method = decode_html(body, ctype)
+        yield FetchResult(url=url, status_code=status or 200, content_type=ctype.lower(), text=text, encoding=enc, encoding_method=method, content_language=http_headers.get("content-language"))
+
+
+def iter_warc_records(path: PathLike) -> Iterator[FetchResult]:
+    """Stream HTML response/resource records out of a WARC or WARC.gz file."""
+    path = Path(path)
+    try:
+        mm = _map_file(path)
+    except OSError as exc:
+        yield _file_error(path, f"read-failed: {exc}")
+        return
+    if mm is None:
+        return
+    try:
+        # Per-record gzip members are concatenated; GzipFile reads across them
+        if mm[:2] == b"\x1f\x8b":
+            with gzip.GzipFile(fileobj=mm) as gz:  # type: ignore[arg-type]
+                yield from _iter_warc_stream(gz)  # type: ignore[arg-type]
+        else:
+            yield from _iter_warc_stream(mm)  # type: ignore[arg-type]
+    except (EOFError, OSError, zlib.error) as exc:
+        # A truncated or corrupt archive ends this file only; records already read stand
+        yield _file_error(path, f"warc-read-failed: {exc}")
+    finally:
+        mm.close()
+
+
+def _sniff_original_url(head: bytes) -> Optional[str]:
+    m = _SAVED_FROM_RE.search(head)
+    if m:
+        return m.group(1).decode("latin-1")
+    for tag_re in (_CANONICAL_RE, _OG_URL_RE):
+        tag = tag_re.search(head)
+        if tag:
+            href = _HREF_RE.search(tag.group(0))
+            if href and href.group(1).lower().startswith((b"http://", b"https://")):
+                return href.group(1).decode("latin-1")
+    return None
+
+
+def read_html_file(path: PathLike) -> FetchResult:
+    """Load one saved page, recovering its original URL when the page records it."""
+    path = Path(path)
+    try:
+        raw = path.read_bytes()
+    except OSError as exc:
+        return _file_error(path, f"read-failed: {exc}")
+    if not raw:
+        return FetchResult(url=path.resolve().as_uri(), status_code=200, content_type="text/html", text=None, error="empty-file")
+    url = _sniff_original_url(raw[:_SNIFF_BYTES]) or path.resolve().as_uri()
+    text, enc, method = decode_html(raw)
+    return FetchResult(url=url, status_code=200, content_type="text/html", text=text, encoding=enc, encoding_method=method)
+
+
+def iter_html_files(root: PathLike) -> Iterator[FetchResult]:
+    """Walk a directory tree of saved pages in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if Path(name).suffix.lower() in HTML_SUFFIXES:
+                yield read_html_file(Path(dirpath) / name)
+
+
+def iter_records(paths: Iterable[PathLike]) -> Iterator[FetchResult]:
+    """Yield pages from any mix of WARC files, saved HTML files and directories.
+
+    Unreadable inputs become error results, so one bad file does not end the run.
+    """
+    for p in paths:
+        path = Path(p)
+        if path.is_dir():
+            yield from iter_html_files(path)
+        elif not path.exists():
+            yield _file_error(path, "not-found")
+        elif path.name.lower().endswith(WARC_SUFFIXES):
+            yield from iter_warc_records(path)
+        elif path.suffix.lower() in HTML_SUFFIXES:
+            yield read_html_file(path)
+        else:
+            yield _file_error(path, "unsupported-file-type")
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+
+# Category-agnostic product signals: model numbers and units
+_MODEL_RE = re.compile(r"\b[A-Z]{2,}\d{2,}\b|\b\d{1,2}(-|\s)?slice\b")
+_UNIT_RE = re.compile(r"\b(\d+(?:\.\d+)?\s?(inch|in|w|v|watts|lbs|pounds))\b")
+
+
+def _canon(s: str) -> str:
+    s = s.lower().replace('-', ' ')
+    return re.sub(r"\s+", " ", s).strip()
+
+
+class PhraseTable:
+    """Per-process phrase ⇄ small integer ID table, bounded by ``max_phrases``.
+
+    The same phrases recur across a batch ("stainless steel", brand names), so
+    each distinct phrase is stored once along with what scoring derives from it
+    (stem key, word count, model/unit flags, diversify form). IDs are only valid
+    within one page: ``begin_page`` clears the table once it is over its bound.
+    """
+
+    __slots__ = ("max_phrases", "ids", "phrases", "resets", "_keys", "_features", "_canon")
+
+    def __init__(self, max_phrases: int = 50_000) -> None:
+        self.max_phrases = max_phrases
+        self.resets = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.phrases: List[str] = []
+        self._keys: Dict[str, Dict[int, int]] = {}  # lang → phrase ID → stem key ID
+        self._features: Dict[int, Tuple[int, bool, bool]] = {}
+        self._canon: Dict[int, Tuple[str, FrozenSet[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def begin_page(self) -> None:
+        if len(self.phrases) > self.max_phrases:
+            self._clear()
+            self.resets += 1
+
+    def intern(self, phrase: str) -> int:
+        pid = self.ids.get(phrase)
+        if pid is None:
+            pid = self.ids[phrase] = len(self.phrases)
+            self.phrases.append(phrase)
+        return pid
+
+    def shared(self, phrase: str) -> str:
+        """The table's copy of ``phrase``, so repeats across pages share one string."""
+        return self.phrases[self.intern(phrase)]
+
+    def text(self, pid: int) -> str:
+        return self.phrases[pid]
+
+    def stem_key(self, pid: int, lang: str) -> int:
+        keys = self._keys.get(lang)
+        if keys is None:
+            keys = self._keys[lang] = {}
+        kid = keys.get(pid)
+        if kid is None:
+            from .scoring import _stem_key
+
+            kid = keys[pid] = self.intern(_stem_key(self.phrases[pid], lang))
+        return kid
+
+    def features(self, pid: int) -> Tuple[int, bool, bool]:
+        """(word count, model-number flag, unit flag)."""
+        feats = self._features.get(pid)
+        if feats is None:
+            phrase = self.phrases[pid]
+            feats = self._features[pid] = (
+                max(1, len(phrase.split())),
+                _MODEL_RE.search(phrase) is not None,
+                _UNIT_RE.search(phrase) is not None,
+            )
+        return feats
+
+    def canon(self, pid: int) -> Tuple[str, FrozenSet[str]]:
+        """Lowercased, dash-free form and its word set, as diversify compares them."""
+        form = self._canon.get(pid)
+        if form is None:
+            c = _canon(self.phrases[pid])
+            form = self._canon[pid] = (c, frozenset(c.split()))
+        return form
+
+
+_TABLE: Optional[PhraseTable] = None
+
+
+def phrase_table() -> PhraseTable:
+    """The process-wide table; each worker process gets its own."""
+    global _TABLE
+    if _TABLE is None:
+        _TABLE = PhraseTable()
+    return _TABLE
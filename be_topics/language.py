@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional, Pattern, Tuple
+
+from .lexicon import stem as _porter_stem
+
+
+ENGLISH = "en"
+
+# The English path's tokenizer and word lists, shared by candidate generation and detection
+ENGLISH_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:[.\-][A-Za-z0-9]+)*")
+ENGLISH_STOPWORDS: FrozenSet[str] = frozenset({
+    'any', 'haven', 'aren', 'himself', 'ain', 'mustn', 'doesn', 'herself', "isn't", 'can', 'both', 'needn', 'myself', "he's", 'once',
+    "a","an","the","and","or","but","if","then","else","for","to","of","in","on","with","by","from",
+    "at","as","is","are","was","were","be","been","being","this","that","these","those","it","its",
+    "you","your","we","our","they","their","he","she","his","her","them","us","i","me","my", "control", "becoming"
+    "about","into","over","under","up","down","out","off","so","not","no","yes","can","will","make","makes", "feature","featured",
+    'doing', 'same', 'is', "he'll", 'down', 'themselves', 'own', "couldn't", "she'd", 'o', 'into', 'was', 'yourselves', "you've", 'and', 'd', 'about', "we'll", 'where', "won't", "they're", "i'm", 'weren', 'hers', 'above', 'we', 'my', 'off', "i'll", 'shouldn', 'those', 'theirs', 'just', 'itself', 'again', 'here', 'his', 'all', 'hadn', 'while', 'or', "should've", 'whom', "she's", 'she', 'why', 'he', 'through', 'during', 'each', "hadn't", 'had', "you'll", 'at', "doesn't", 'these', 'how', 'but', "we've", 'isn', 'him', "wasn't", 'were', 'has', "we'd", 'me', "they've", 'did', 'wouldn', 'against', 'will', "hasn't", 'between', 'are', 'the', 'your', "didn't", "aren't", "he'd", 've', 'which', 'very', 'mightn', 'until', "shan't", "you'd", 'because', "she'll", 'other', 'don', 'in', "they'd", 'wasn', 'from', 'won', 'having', 'our', 'couldn', 'for', 'to', "they'll", 'their', 'then', 'ma', 'too', 'y', 'a', "that'll", "i'd", 'when', "we're", "wouldn't", 'as', 'what', 'you', 'does', 'than', 'it', 'shan', 'now', 'of', 'i', 'below', 're', 'ours', "it's", 'yourself', 'before', 'few', 'll', 'didn', "i've", 'on', 'out', 'that', 'after', "it'd", "needn't", 'have', 'such', "shouldn't", 'so', 'who', 'more', 'should', 'under', 'them', "mustn't", "it'll", 'this', "weren't", 'hasn', 'further', 'yours', 'they', 'am', 'with', 'there', "haven't", 'some', 'by', 'over', 'an', 'its', 'up', 'been', 'being', 't', "you're", 'no', 'do', 'most', "don't", 'if', 'her', 'm', 'be', 'not', 'only', 's', "mightn't", 'nor', 'ourselves'})
+STOP_VERBS: FrozenSet[str] = frozenset({
+    "meet","start","enter","change","unmute","learn","click","submit","contact",
+})
+PRONOUNS_DET: FrozenSet[str] = frozenset({"my","your","our","his","her","their","this","that","these","those"})
+
+# Most frequent function words; enough for detection and as a stopword fallback
+# when the NLTK stopwords corpus is not installed
+_FALLBACK_STOPWORDS: Dict[str, str] = {
+    "de": "der die das und ist nicht ein eine einer eines dem den des mit von zu im für auf sich auch es als an wie bei oder aus nach um wird sind werden über noch nur so ihr sie wir",
+    "es": "el la los las de del y en que es un una por con para se no al lo como más su sus o pero este esta son sin sobre también muy entre",
+    "fr": "le la les de des du et en un une est que qui pour dans pas par sur au aux avec ce cette il elle ne se plus ou sont son ses",
+    "it": "il lo la gli le di del della e che è un una per con non in da al alla sono si come più anche ma questo questa",
+    "pt": "o a os as de do da dos das e que é um uma para com não em no na por se mais como mas ao aos seu sua são",
+    "nl": "de het een en van is dat op te in met voor niet zijn er aan als ook maar om door bij dan wordt",
+}
+# Any fallback language's function words; bounds every per-language hit count at once
+_FALLBACK_WORDS: FrozenSet[str] = frozenset(w for words in _FALLBACK_STOPWORDS.values() for w in words.split())
+_NLTK_NAMES = {
+    "en": "english", "de": "german", "es": "spanish", "fr": "french", "it": "italian",
+    "pt": "portuguese", "nl": "dutch", "sv": "swedish", "da": "danish", "no": "norwegian",
+    "fi": "finnish", "ru": "russian", "hu": "hungarian", "ro": "romanian", "ar": "arabic",
+}
+CJK_LANGUAGES = {"zh", "ja", "ko"}
+# Particles/function characters: CJK runs are cut at them, since they rarely belong to a topic
+_CJK_STOP_CHARS: Dict[str, str] = {
+    "ja": "のはがをにでともへやかなだすしてたいるれ、。・「」",
+    "zh": "的了和是在也就都而及与着或把被让其之，。、",
+    "ko": "은는이가을를에의도와과로서",
+}
+
+_LANG_TAG_RE = re.compile(r"^\s*([A-Za-z]{2,3})")
+# Letters/digits of any script, joined by the same separators the English tokenizer allows
+_UNICODE_TOKEN_RE = re.compile(r"[^\W_]+(?:[.\-][^\W_]+)*")
+CJK_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]")
+_KANA_RE = re.compile(r"[぀-ヿ]")
+_KATAKANA_RE = re.compile(r"[゠-ヿ]")
+_HANGUL_RE = re.compile(r"[가-힯]")
+_CJK_RUN_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]+|[^\W_]+(?:[.\-][^\W_]+)*")
+_WORD_RE = re.compile(r"[^\W\d_]{2,}")
+_SAMPLE_CHARS = 2000
+
+
+@dataclass
+class LanguageSupport:
+    """Tokenizer, stopwords and stemmer for one language, built on first use."""
+    code: str
+    stopwords: FrozenSet[str]
+    stem: Callable[[str], str]
+    token_re: Pattern[str] = _UNICODE_TOKEN_RE
+    cjk: bool = False
+    stop_chars: FrozenSet[str] = frozenset()
+    edge_words: FrozenSet[str] = field(init=False)  # stopwords plus pronouns, rejected at phrase edges
+
+    def __post_init__(self) -> None:
+        self.edge_words = self.stopwords | PRONOUNS_DET
+
+    def tokens(self, text: str) -> List[str]:
+        if not self.cjk:
+            return self.token_re.findall(text)
+        # CJK runs have no spaces: cut them at particles and katakana/other script changes,
+        # keeping pieces of two or more characters whole
+        out: List[str] = []
+        stop = self.stop_chars
+        for run in _CJK_RUN_RE.findall(text):
+            if not CJK_RE.match(run):
+                out.append(run)
+                continue
+            start = 0
+            for i in range(1, len(run) + 1):
+                if i == len(run) or run[i] in stop or _is_katakana(run[i - 1]) != _is_katakana(run[i]):
+                    piece = run[start:i]
+                    if len(piece) >= 2:
+                        out.append(piece)
+                    start = i + 1 if i < len(run) and run[i] in stop else i
+        return out
+
+
+# ISO 639-2 (bibliographic and terminology) codes of the languages above, and Norwegian variants
+_ISO639_1 = {
+    "eng": "en", "deu": "de", "ger": "de", "spa": "es", "fra": "fr", "fre": "fr", "ita": "it",
+    "por": "pt", "nld": "nl", "dut": "nl", "swe": "sv", "dan": "da", "nor": "no", "nob": "no",
+    "nno": "no", "nb": "no", "nn": "no", "fin": "fi", "rus": "ru", "hun": "hu", "ron": "ro",
+    "rum": "ro", "ara": "ar", "zho": "zh", "chi": "zh", "jpn": "ja", "kor": "ko",
+}
+
+
+def _is_katakana(ch: str) -> bool:
+    return _KATAKANA_RE.match(ch) is not None
+
+
+def _primary(tag: Optional[str]) -> str:
+    m = _LANG_TAG_RE.match(tag or "")
+    code = m.group(1).lower() if m else ""
+    return _ISO639_1.get(code, code)
+
+
+def _supported(code: str) -> bool:
+    return code == ENGLISH or code in _NLTK_NAMES or code in _FALLBACK_STOPWORDS or code in CJK_LANGUAGES
+
+
+def detect_language(html_lang: str = "", content_language: str = "", sample: str = "") -> str:
+    """``<html lang>``, then ``Content-Language``, then a script/stopword guess on ``sample``.
+
+    Tags naming a language without stopwords fall through to the guess; the
+    first of them is kept when the guess is English without English evidence.
+    """
+    unsupported = ""
+    for tag in (html_lang, (content_language or "").split(",")[0]):
+        code = _primary(tag)
+        if _supported(code):
+            return code
+        unsupported = unsupported or code
+    code, en_hits = _guess(sample[:_SAMPLE_CHARS])
+    if code == ENGLISH and unsupported and not en_hits:
+        return unsupported
+    return code
+
+
+def _guess(sample: str) -> Tuple[str, int]:
+    """Language code for ``sample`` and its English stopword hit count."""
+    cjk = len(CJK_RE.findall(sample))
+    if cjk and cjk * 4 >= len(sample.replace(" ", "")):
+        if _KANA_RE.search(sample):
+            return "ja", 0
+        if _HANGUL_RE.search(sample):
+            return "ko", 0
+        return "zh", 0
+    words = [w.lower() for w in _WORD_RE.findall(sample)]
+    if not words:
+        return ENGLISH, 0
+    en_hits = other_hits = 0
+    for w in words:
+        if w in ENGLISH_STOPWORDS:
+            en_hits += 1
+        if w in _FALLBACK_WORDS:
+            other_hits += 1
+    # No single language can have more hits than all of them together: most
+    # English pages are decided here without the per-language scans
+    if other_hits <= en_hits * 1.5 or other_hits < 3:
+        return ENGLISH, en_hits
+    best, best_hits = ENGLISH, 0
+    for code in _FALLBACK_STOPWORDS:
+        stop = _fallback_set(code)
+        hits = sum(1 for w in words if w in stop)
+        if hits > best_hits:
+            best, best_hits = code, hits
+    # English stays the default unless another language is clearly ahead
+    return (best if best_hits > en_hits * 1.5 and best_hits >= 3 else ENGLISH), en_hits
+
+
+_FALLBACK_CACHE: Dict[str, FrozenSet[str]] = {}
+
+
+def _fallback_set(code: str) -> FrozenSet[str]:
+    words = _FALLBACK_CACHE.get(code)
+    if words is None:
+        words = _FALLBACK_CACHE[code] = frozenset(_FALLBACK_STOPWORDS.get(code, "").split())
+    return words
+
+
+def _load_stopwords(code: str) -> FrozenSet[str]:
+    name = _NLTK_NAMES.get(code)
+    if name:
+        try:
+            from nltk.corpus import stopwords  # type: ignore
+
+            return frozenset(w.lower() for w in stopwords.words(name)) | _fallback_set(code)
+        except Exception:
+            pass
+    return _fallback_set(code)
+
+
+def _load_stemmer(code: str) -> Callable[[str], str]:
+    name = _NLTK_NAMES.get(code)
+    if name and code != ENGLISH:
+        try:
+            from nltk.stem.snowball import SnowballStemmer
+
+            return SnowballStemmer(name).stem
+        except Exception:
+            pass
+    return lambda word: word
+
+
+_LOADED: Dict[str, LanguageSupport] = {}
+
+
+def get_language(code: str) -> LanguageSupport:
+    """Per-language support, loaded lazily and cached for the life of the process."""
+    support = _LOADED.get(code)
+    if support is not None:
+        return support
+    if code == ENGLISH:
+        # The English path keeps the original ASCII tokenizer, stopwords and Porter stems
+        support = LanguageSupport(code, ENGLISH_STOPWORDS, _porter_stem, token_re=ENGLISH_TOKEN_RE)
+    else:
+        support = LanguageSupport(
+            code, _load_stopwords(code), _load_stemmer(code),
+            cjk=code in CJK_LANGUAGES, stop_chars=frozenset(_CJK_STOP_CHARS.get(code, "")),
+        )
+    _LOADED[code] = support
+    return support
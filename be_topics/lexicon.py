@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from nltk.stem import PorterStemmer
+
+
+# File layout (little-endian):
+#   header   "<4sHHII"   magic, version, table count, blob offset, blob size
+#   tables   "<16sBxxxII" per table: name, kind (1 map), slot count (power of two), slot offset
+#   slots    "<III"      per slot: crc32(key), key offset, value offset (EMPTY = free slot)
+#   blob     strings as 1-byte length + UTF-8
+MAGIC = b"BELX"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHII")
+_TABLE = struct.Struct("<16sBxxxII")
+_SLOT = struct.Struct("<III")
+_EMPTY = 0xFFFFFFFF
+_MAP = 1
+
+ENV_VAR = "BE_TOPICS_LEXICON"
+
+_STEMMER = PorterStemmer()
+
+
+def _slots_for(n: int) -> int:
+    size = 8
+    while size < n * 2:  # load factor <= 0.5 keeps probes short
+        size <<= 1
+    return size
+
+
+def build_lexicon_file(path: str, words: Iterable[str]) -> Dict[str, int]:
+    """Write a read-only lexicon file holding the Porter stem of every word in ``words``."""
+    stems: Dict[str, str] = {}
+    for word in words:
+        w = word.lower()
+        if w.isalpha() and len(w) > 2 and w not in stems and len(w.encode("utf-8")) < 256:
+            stems[w] = _STEMMER.stem(w)
+    tables: List[Tuple[str, int, Dict[str, str]]] = [("stems", _MAP, stems)]
+
+    blob = bytearray()
+    offsets: Dict[str, int] = {}
+
+    def intern(s: str) -> int:
+        off = offsets.get(s)
+        if off is None:
+            raw = s.encode("utf-8")
+            off = offsets[s] = len(blob)
+            blob.append(len(raw))
+            blob.extend(raw)
+        return off
+
+    slot_bytes: List[bytes] = []
+    directory: List[Tuple[str, int, int, int]] = []
+    pos = _HEADER.size + _TABLE.size * len(tables)
+    for name, kind, entries in tables:
+        n_slots = _slots_for(len(entries))
+        slots = [(0, _EMPTY, _EMPTY)] * n_slots
+        for key, value in entries.items():
+            h = zlib.crc32(key.encode("utf-8"))
+            i = h & (n_slots - 1)
+            while slots[i][1] != _EMPTY:
+                i = (i + 1) & (n_slots - 1)
+            key_off = intern(key)
+            slots[i] = (h, key_off, intern(value))
+        directory.append((name, kind, n_slots, pos))
+        slot_bytes.append(b"".join(_SLOT.pack(*s) for s in slots))
+        pos += n_slots * _SLOT.size
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, VERSION, len(tables), pos, len(blob)))
+        for name, kind, n_slots, offset in directory:
+            fh.write(_TABLE.pack(name.encode("ascii")[:16], kind, n_slots, offset))
+        for chunk in slot_bytes:
+            fh.write(chunk)
+        fh.write(blob)
+    os.replace(tmp, path)
+    return {name: len(entries) for name, _, entries in tables}
+
+
+class LexiconFile:
+    """Memory-mapped lexicon; every process mapping the same file shares its pages."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_tables, self._blob, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a lexicon file (version {VERSION})")
+        self._tables: Dict[str, Tuple[int, int, int]] = {}
+        for i in range(n_tables):
+            name, kind, n_slots, offset = _TABLE.unpack_from(self._mm, _HEADER.size + i * _TABLE.size)
+            self._tables[name.rstrip(b"\0").decode("ascii")] = (kind, n_slots - 1, offset)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._tables)
+
+    def _string(self, off: int) -> bytes:
+        start = self._blob + off
+        return self._mm[start + 1 : start + 1 + self._mm[start]]
+
+    def _find(self, table: str, key: str) -> int:
+        spec = self._tables.get(table)
+        if spec is None:
+            return _EMPTY
+        _, mask, offset = spec
+        raw = key.encode("utf-8")
+        h = zlib.crc32(raw)
+        i = h & mask
+        while True:
+            slot_h, key_off, val_off = _SLOT.unpack_from(self._mm, offset + i * _SLOT.size)
+            if key_off == _EMPTY:
+                return _EMPTY
+            if slot_h == h and self._string(key_off) == raw:
+                return val_off
+            i = (i + 1) & mask
+
+    def get(self, table: str, key: str) -> Optional[str]:
+        off = self._find(table, key)
+        return None if off == _EMPTY else self._string(off).decode("utf-8")
+
+    def stem(self, word: str) -> Optional[str]:
+        return self.get("stems", word)
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+_ACTIVE: Optional[LexiconFile] = None
+_ENV_CHECKED = False
+
+
+def load_lexicon(path: Optional[str]) -> Optional[LexiconFile]:
+    """Map ``path`` as the process-wide lexicon (None unmaps it)."""
+    global _ACTIVE, _ENV_CHECKED
+    _ENV_CHECKED = True
+    _ACTIVE = LexiconFile(path) if path else None
+    return _ACTIVE
+
+
+def active_lexicon() -> Optional[LexiconFile]:
+    global _ENV_CHECKED
+    if not _ENV_CHECKED:
+        # Workers pick the file up from the environment without extra wiring
+        _ENV_CHECKED = True
+        if os.environ.get(ENV_VAR):
+            load_lexicon(os.environ[ENV_VAR])
+    return _ACTIVE
+
+
+def stem(word: str) -> str:
+    """Porter stem, answered from the mapped stem table when the word is in it."""
+    lex = active_lexicon()
+    if lex is not None:
+        hit = lex.stem(word)
+        if hit is not None:
+            return hit
+    return _STEMMER.stem(word)
+
+
+def vocabulary(word_files: Iterable[str] = (), page_paths: Iterable[str] = ()) -> Iterable[str]:
+    """Words from plain word lists (one per line) and from the text of saved pages/WARCs."""
+    import re
+
+    from .ingest import iter_records
+    from .parser import clean_html
+
+    for path in word_files:
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            for line in fh:
+                yield from line.split()
+    pages = list(page_paths)
+    if pages:
+        word_re = re.compile(r"[A-Za-z]{3,}")
+        for fetch in iter_records(pages):
+            if fetch.text:
+                yield from word_re.findall(clean_html(fetch.text).get_text(" "))
@@ -1,16 +1,29 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import AbstractSet, Callable, Dict, List, Optional, Tuple
 import itertools
 
-from bs4 import BeautifulSoup, Comment
+from bs4 import BeautifulSoup, Comment, Tag
+
+from .profiles import DEFAULT, SiteProfile
+from .structured import StructuredData, extract_structured_data
 
 
 MAIN_TAGS = {"article", "main", "section", "div"}
 
 
+@dataclass
+class ParseLimits:
+    """Hard caps for bounded-memory parsing of very large pages."""
+    max_html_chars: int = 1_500_000  # raw HTML handed to lxml
+    max_nodes: int = 15_000  # opening tags kept before the document is cut
+    max_items: int = 100  # entries per list field (paragraphs, li, anchors, ...)
+    max_item_chars: int = 1_000  # text kept per entry
+    max_field_chars: int = 32_000  # total text kept per field
+
+
 @dataclass
 class PageContent:
     title: str
@@ -32,10 +45,19 @@ class PageContent:
     highlighted_texts: List[str]
     bullets: List[str]
     specs: List[str]
+    structured: StructuredData = field(default_factory=StructuredData)
+    canonical_url: str = ""
+    og_type: str = ""
+    author: str = ""
+    lang: str = ""  # <html lang>
+    price_tagged: bool = False  # the price came from the site profile's price selector
 
 
 def clean_html(html: str) -> BeautifulSoup:
-    soup = BeautifulSoup(html, "lxml")
+    return _strip_noise(BeautifulSoup(html, "lxml"))
+
+
+def _strip_noise(soup: BeautifulSoup) -> BeautifulSoup:
     # Remove scripts, styles, and noisy elements
     for tag in soup(["script", "style", "noscript", "iframe", "svg", "link"]):
         tag.decompose()
@@ -45,6 +67,97 @@ def clean_html(html: str) -> BeautifulSoup:
     return soup
 
 
+_TAG_OPEN_RE = re.compile(r"<[A-Za-z]")
+
+
+def _truncate_html(html: str, limits: ParseLimits) -> str:
+    # Cut the document before parsing so lxml never builds the oversized tree
+    if len(html) > limits.max_html_chars:
+        html = html[: limits.max_html_chars]
+    cut = next(itertools.islice(_TAG_OPEN_RE.finditer(html), limits.max_nodes, None), None)
+    if cut is not None:
+        html = html[: cut.start()]
+    return html
+
+
+def _find(root, name, limits: Optional[ParseLimits]):
+    if limits is None:
+        return root.find_all(name)
+    # Lazy walk so collection can stop at the cap without listing every match
+    names = {name} if isinstance(name, str) else set(name)
+    return (d for d in root.descendants if isinstance(d, Tag) and d.name in names)
+
+
+def _joined_text(element, cap: int) -> str:
+    # get_text(" ", strip=True) that stops reading once ``cap`` chars are collected
+    parts: List[str] = []
+    size = 0
+    for piece in element.stripped_strings:
+        parts.append(piece)
+        size += len(piece) + 1
+        if size >= cap:
+            break
+    return " ".join(parts)[:cap]
+
+
+def _text(element, limits: Optional[ParseLimits]) -> str:
+    if limits is None:
+        return element.get_text(" ", strip=True)
+    return _joined_text(element, limits.max_item_chars)
+
+
+def _texts(elements, limits: Optional[ParseLimits], min_len: int = 0, cap: Optional[int] = None) -> List[str]:
+    out: List[str] = []
+    budget = limits.max_field_chars if limits else 0
+    for el in elements:
+        txt = _text(el, limits)
+        if len(txt) < min_len:
+            continue
+        out.append(txt)
+        if cap is not None and len(out) >= cap:
+            break
+        if limits is not None:
+            budget -= len(txt)
+            if budget <= 0 or len(out) >= limits.max_items:
+                break
+    return out
+
+
+def _attrs(elements, attr: str, limits: Optional[ParseLimits]) -> List[str]:
+    out: List[str] = []
+    for el in elements:
+        val = el.get(attr)
+        if not val:
+            continue
+        out.append(val.strip() if limits is None else val.strip()[: limits.max_item_chars])
+        if limits is not None and len(out) >= limits.max_items:
+            break
+    return out
+
+
+def _text_len(element, cap: int) -> int:
+    n = 0
+    for piece in element.stripped_strings:
+        n += len(piece) + 1
+        if n >= cap:
+            break
+    return n
+
+
+def _score_block_bounded(element, limits: ParseLimits) -> float:
+    # Same heuristic as _score_block without materializing the subtree text
+    cap = limits.max_field_chars
+    text_len = _text_len(element, cap) or 1
+    num_p = len(element.find_all("p", limit=limits.max_items))
+    link_len = 0
+    for a in element.find_all("a", limit=limits.max_items):
+        link_len += _text_len(a, cap)
+        if link_len >= text_len:
+            break
+    ld = min(link_len / text_len, 1.0)
+    return (text_len / 100.0) + (num_p * 2.0) - (ld * 50.0)
+
+
 def _link_density(element) -> float:
     text_len = len(element.get_text(" ", strip=True)) or 1
     link_text = " ".join(a.get_text(" ", strip=True) for a in element.find_all("a"))
@@ -60,7 +173,7 @@ def _score_block(element) -> float:
     return (text_len / 100.0) + (num_p * 2.0) - (ld * 50.0)
 
 
-def extract_main_block(soup: BeautifulSoup):
+def extract_main_block(soup: BeautifulSoup, limits: Optional[ParseLimits] = None):
     candidates = [
         e for e in soup.find_all(MAIN_TAGS)
         if e.name in MAIN_TAGS
@@ -71,7 +184,7 @@ def extract_main_block(soup: BeautifulSoup):
     best = None
     best_score = float("-inf")
     for e in candidates:
-        score = _score_block(e)
+        score = _score_block(e) if limits is None else _score_block_bounded(e, limits)
         if score > best_score:
             best = e
             best_score = score
@@ -174,8 +287,35 @@ def _extract_semantic_ids(root: BeautifulSoup, limit: int = 20) -> List[str]:
     return ids
 
 
-def parse_content(html: str) -> PageContent:
-    soup = clean_html(html)
+# Fields parse_content collects only after the ``skip`` callback has seen everything else
+LATE_FIELDS = (
+    "list_items", "anchor_texts", "input_placeholders", "images_alt",
+    "semantic_classes", "semantic_ids", "highlighted_texts",
+)
+
+
+def parse_content(
+    html: str,
+    limits: Optional[ParseLimits] = None,
+    profile: SiteProfile = DEFAULT,
+    skip: Optional[Callable[[PageContent], AbstractSet[str]]] = None,
+) -> PageContent:
+    """Parse a page into PageContent; ``limits`` switches on bounded-memory mode.
+
+    ``skip`` is called with the content parsed so far (every field except
+    ``LATE_FIELDS``) and returns the late fields to leave empty. The pipeline
+    classifies the page there so a page-type plan can avoid parsing fields it
+    will not use.
+    """
+    if limits is not None:
+        html = _truncate_html(html, limits)
+    soup = BeautifulSoup(html, "lxml")
+    # Structured data lives in <script> tags, so read it before they are stripped
+    structured = extract_structured_data(soup, limit=limits.max_items if limits else None)
+    canonical = soup.find("link", rel="canonical", href=True)
+    canonical_url = canonical["href"].strip() if canonical else ""
+    lang = str(soup.html.get("lang") or soup.html.get("xml:lang") or "") if soup.html else ""
+    _strip_noise(soup)
     # print(soup)
     title = (soup.title.string or "").strip() if soup.title else ""
     md = soup.find("meta", attrs={"name": "description"})
@@ -184,105 +324,86 @@ def parse_content(html: str) -> PageContent:
     og_description = (soup.find("meta", property="og:description") or {}).get("content", "") if soup else ""
     tw_title = (soup.find("meta", attrs={"name": "twitter:title"}) or {}).get("content", "") if soup else ""
     tw_description = (soup.find("meta", attrs={"name": "twitter:description"}) or {}).get("content", "") if soup else ""
+    og_type = (soup.find("meta", property="og:type") or {}).get("content", "").strip().lower()
+    author = (soup.find("meta", attrs={"name": "author"}) or soup.find("meta", property="article:author") or {}).get("content", "").strip()
     h_tags = [
-        *[h.get_text(" ", strip=True) for h in soup.find_all("h1")],
-        *[h.get_text(" ", strip=True) for h in soup.find_all("h2")],
-        *[h.get_text(" ", strip=True) for h in soup.find_all("h3")],
-        *[h.get_text(" ", strip=True) for h in soup.find_all("h4")],
-        *[h.get_text(" ", strip=True) for h in soup.find_all("h5")],
-        *[h.get_text(" ", strip=True) for h in soup.find_all("h6")],
+        *_texts(_find(soup, "h1", limits), limits),
+        *_texts(_find(soup, "h2", limits), limits),
+        *_texts(_find(soup, "h3", limits), limits),
+        *_texts(_find(soup, "h4", limits), limits),
+        *_texts(_find(soup, "h5", limits), limits),
+        *_texts(_find(soup, "h6", limits), limits),
     ]
 
     # print(f"{len(h_tags)} H Tags Found: [{'\n\n'.join(h_tags)}]\n\n")
 
-    main = extract_main_block(soup)
-    paragraphs = [p.get_text(" ", strip=True) for p in main.find_all("p")]
+    main = extract_main_block(soup, limits)
+    paragraphs = _texts(_find(main, "p", limits), limits)
 
     # print(f"{len(paragraphs)} P Tags Found: [{'\n\n'.join(paragraphs)}]")
 
-    highlighted_text = [
-        *[p.get_text(" ", strip=True) for p in soup.find_all("b")],
-        *[s.get_text(" ", strip=True) for s in soup.find_all("strong")],
-        *[u.get_text(" ", strip=True) for u in soup.find_all("u")],
-        # *[bl.get_text(" ", strip=True) for bl in soup.find_all("bold")],
-    ]
-    # print(f"{len(highlighted_text)} Tags Highlighted: [{'\n\n'.join(highlighted_text)}]\n\n\n")
+    # Buttons feed classification (add-to-cart), so they are parsed early
+    button_texts = _texts(_find(main, "button", limits), limits, min_len=1)
 
-    list_items = [li.get_text(" ", strip=True) for li in main.find_all("li")][:30]
-    # Anchor texts that look content-like (exclude menus/nav via short length and repetitive items)
-    anchor_texts = [a.get_text(" ", strip=True) for a in main.find_all("a") if len(a.get_text(" ", strip=True)) >= 3][:50]
-    # Buttons and input placeholders
-    button_texts = [b.get_text(" ", strip=True) for b in main.find_all("button") if b.get_text(" ", strip=True)]
-    input_placeholders = [inp.get("placeholder", "").strip() for inp in main.find_all("input") if inp.get("placeholder")]
-    images_alt = [img.get("alt", "").strip() for img in main.find_all("img") if img.get("alt")]
-    semantic_classes = _extract_semantic_classes(main)
-    # print(f"Residual HTML Soup: \n\n\n[{main}]\n\n\n\n")
-    semantic_ids = _extract_semantic_ids(main)
-    # print(f"Residual HTML Soup: \n\n\n[{soup}]\n\n\n\n")
+    # Schema.org names/brands/headlines/keywords to boost topics
+    json_ld_texts = structured.texts()
 
-    # Extract simple JSON-LD strings (names) to boost topics
-    json_ld_texts: List[str] = []
-    for script in soup.find_all("script", type=re.compile(r"application/(ld\+json|json)")):
-        content = script.string
-        if content:
-            json_ld_texts.append(content[:5000])  # cap to keep small
-
-    # Extract product bullets (e.g., Amazon "About this item")
+    # Extract product bullets (e.g., Amazon "About this item"); selectors come from the site profile
     bullets: List[str] = []
-    fb = soup.find(id=re.compile(r"feature-bullets|featurebullets", re.I))
+    fb = next(filter(None, (soup.find(id=r) for r in profile.bullet_id_res)), None)
     if fb:
-        bullets.extend([li.get_text(" ", strip=True) for li in fb.find_all("li")])
-    else:
-        about = soup.find(lambda t: t.name in ("h1","h2","h3","h4","h5","h6") and re.search(r"about this item", t.get_text(" ", strip=True), re.I))
+        bullets.extend(_texts(_find(fb, "li", limits), limits))
+    elif profile.bullet_heading_res:
+        about = soup.find(lambda t: t.name in ("h1","h2","h3","h4","h5","h6") and any(r.search(t.get_text(" ", strip=True)) for r in profile.bullet_heading_res))
         if about:
             ul = about.find_next("ul")
             if ul:
-                bullets.extend([li.get_text(" ", strip=True) for li in ul.find_all("li")])
+                bullets.extend(_texts(_find(ul, "li", limits), limits))
 
     # Extract simple spec tables (key-value rows)
     specs: List[str] = []
-    spec_containers = [
-        soup.find(id=re.compile(r"productDetails_techSpec_section_1", re.I)),
-        soup.find(id=re.compile(r"productDetails_detailBullets_sections1", re.I)),
-        soup.find(id=re.compile(r"productOverview_feature_div", re.I)),
-    ]
+    spec_containers = [soup.find(id=r) for r in profile.spec_id_res]
     for container in filter(None, spec_containers):
-        for row in container.find_all("tr"):
+        for row in _find(container, "tr", limits):
             th = row.find(["th","td"])
             tds = row.find_all("td")
             if th and tds:
-                key = th.get_text(" ", strip=True)
-                val = tds[-1].get_text(" ", strip=True)
+                key = _text(th, limits)
+                val = _text(tds[-1], limits)
                 if key and val:
                     specs.append(f"{key}: {val}")
+            if limits is not None and len(specs) >= limits.max_items:
+                break
         for dl in container.find_all("dl"):
             dts = dl.find_all("dt")
             dds = dl.find_all("dd")
             for dt, dd in zip(dts, dds):
-                key = dt.get_text(" ", strip=True)
-                val = dd.get_text(" ", strip=True)
+                key = _text(dt, limits)
+                val = _text(dd, limits)
                 if key and val:
                     specs.append(f"{key}: {val}")
 
-    # Price extraction (Amazon and generic): prefer visible accessible price spans
+    # Price extraction (site-specific and generic): prefer visible accessible price spans
     price_candidates: List[str] = []
-    try:
-        for sp in main.select('span.a-offscreen, span.a-color-price, span.p13n-sc-price'):
-            txt = sp.get_text(" ", strip=True)
-            if re.match(r"^\$\s?\d{1,4}(?:[.,]\d{2})$", txt):
-                price_candidates.append(txt)
-    except Exception:
-        pass
+    if profile.price_selector:
+        try:
+            for sp in main.select(profile.price_selector, limit=limits.max_items if limits else None):
+                txt = _text(sp, limits)
+                if re.match(r"^\$\s?\d{1,4}(?:[.,]\d{2})$", txt):
+                    price_candidates.append(txt)
+        except Exception:
+            pass
+    price_tagged = bool(price_candidates)
     if not price_candidates:
         # Fallback: search main text for a price-like pattern
-        main_text = main.get_text(" ", strip=True)
+        main_text = main.get_text(" ", strip=True) if limits is None else _joined_text(main, limits.max_field_chars)
         found = re.findall(r"\$\s?\d{1,4}(?:[.,]\d{2})", main_text)
         if found:
             price_candidates.append(found[0])
     if price_candidates:
         specs.append(f"Price: {price_candidates[0]}")
 
-    return PageContent(
+    content = PageContent(
         title=title,
         meta_description=meta_description,
         og_title=og_title,
@@ -291,17 +412,48 @@ def parse_content(html: str) -> PageContent:
         tw_description=tw_description,
         h_tags=h_tags,
         paragraphs=paragraphs,
-        list_items=list_items,
-        anchor_texts=anchor_texts,
+        list_items=[],
+        anchor_texts=[],
         button_texts=button_texts,
-        input_placeholders=input_placeholders,
-        images_alt=images_alt,
+        input_placeholders=[],
+        images_alt=[],
         json_ld=json_ld_texts,
-        semantic_classes=semantic_classes,
-        semantic_ids=semantic_ids,
-        highlighted_texts=highlighted_text,
+        semantic_classes=[],
+        semantic_ids=[],
+        highlighted_texts=[],
         bullets=bullets,
         specs=specs,
+        structured=structured,
+        canonical_url=canonical_url,
+        og_type=og_type,
+        author=author,
+        lang=lang,
+        price_tagged=price_tagged,
     )
+    skipped = skip(content) if skip is not None else frozenset()
+
+    if "highlighted_texts" not in skipped:
+        content.highlighted_texts = [
+            *_texts(_find(soup, "b", limits), limits),
+            *_texts(_find(soup, "strong", limits), limits),
+            *_texts(_find(soup, "u", limits), limits),
+            # *[bl.get_text(" ", strip=True) for bl in soup.find_all("bold")],
+        ]
+    # print(f"{len(highlighted_text)} Tags Highlighted: [{'\n\n'.join(highlighted_text)}]\n\n\n")
 
-
+    if "list_items" not in skipped:
+        content.list_items = _texts(_find(main, "li", limits), limits, cap=30)
+    # Anchor texts that look content-like (exclude menus/nav via short length and repetitive items)
+    if "anchor_texts" not in skipped:
+        content.anchor_texts = _texts(_find(main, "a", limits), limits, min_len=3, cap=50)
+    if "input_placeholders" not in skipped:
+        content.input_placeholders = _attrs(_find(main, "input", limits), "placeholder", limits)
+    if "images_alt" not in skipped:
+        content.images_alt = _attrs(_find(main, "img", limits), "alt", limits)
+    if "semantic_classes" not in skipped:
+        content.semantic_classes = _extract_semantic_classes(main)
+    # print(f"Residual HTML Soup: \n\n\n[{main}]\n\n\n\n")
+    if "semantic_ids" not in skipped:
+        content.semantic_ids = _extract_semantic_ids(main)
+    # print(f"Residual HTML Soup: \n\n\n[{soup}]\n\n\n\n")
+    return content
@@ -1,38 +1,218 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from collections import deque
+from dataclasses import asdict
+from typing import AbstractSet, Any, Deque, Dict, Iterable, Iterator, List, Optional
 
-from .fetcher import fetch_url
-from .parser import parse_content
-from .classifier import classify_page, PageType
-from .candidates import generate_candidates
-from .scoring import score_candidates, diversify
+from .fetcher import fetch_url, FetchResult, RenderOptions
+from .parser import LATE_FIELDS, PageContent, parse_content, ParseLimits
+from .classifier import Classification, classify
+from .plans import plan_for
+from .language import detect_language
+from .candidates import candidate_sections, generate_candidates
+from .scoring import DEFAULT_WEIGHTS, ScoringWeights, diversify, phrase_stats, score_phrases
+from .rescore import ScoreInputLog
+from .intern import phrase_table
+from .profiles import DEFAULT_REGISTRY, ProfileRegistry
+from .ingest import iter_records
+from .dedup import DuplicateIndex, content_simhash, resolve_canonical, reuse
+from .scheduler import HostScheduler
+from .incremental import IncrementalStats, PageState, StateStore, fingerprint, merge_sections
 
 
-def extract_topics(url: str, top_k: int = 8, timeout: float = 8.0, respect_robots: bool = True, render: bool = False, include_css_topics: bool = False) -> Dict[str, Any]:
-    fetch = fetch_url(url, timeout=timeout, respect_robots=respect_robots, render=render)
+def extract_from_fetch(fetch: FetchResult, top_k: int = 8, include_css_topics: bool = False, limits: Optional[ParseLimits] = None, profiles: Optional[ProfileRegistry] = None, structured_fast_path: bool = True, state: Optional[StateStore] = None, dedup: Optional[DuplicateIndex] = None, classify_only: bool = False, type_plans: bool = True, weights: Optional[ScoringWeights] = None, score_log: Optional[ScoreInputLog] = None) -> Dict[str, Any]:
     if fetch.error or not fetch.text:
         return {
-            "url": url,
+            "url": fetch.url,
             "error": fetch.error or "fetch-failed",
             "status_code": fetch.status_code,
             "topics": [],
         }
 
-    content = parse_content(fetch.text)
-    page_type = classify_page(content)
-    candidates = generate_candidates(content, url=fetch.url, include_css_topics=include_css_topics)
-    scored = score_candidates(candidates)
-    diversified = diversify(scored)
-    top = diversified[:top_k]
+    if dedup is not None:
+        hit = dedup.lookup_url(fetch.url)
+        if hit is not None:
+            dedup.stats.url_hits += 1
+            return reuse(hit, fetch.url, "url")
 
-    return {
+    profile = (profiles or DEFAULT_REGISTRY).for_url(fetch.url)
+    if classify_only:
+        # Triage runs never touch stored topic state
+        state = None
+    previous: Optional[PageState] = None
+    if state is not None:
+        settings = f"{profile.name}@{profile.digest}|css={include_css_topics}|fast={structured_fast_path}|plans={type_plans}|limits={limits}"
+        if weights is not None and weights != DEFAULT_WEIGHTS:
+            settings += f"|weights={fingerprint(repr(weights))}"
+        page_fp = fingerprint(fetch.text)
+        previous = state.get(fetch.url)
+        if previous is not None and previous.settings != settings:
+            previous = None
+        if previous is not None and previous.page_fingerprint == page_fp and previous.top_k == top_k:
+            stats = IncrementalStats(sections=len(previous.sections), reused=len(previous.sections), unchanged_page=True)
+            return {**previous.result, "incremental": asdict(stats)}
+
+    decided: Dict[str, Classification] = {}
+
+    def _plan_fields(early: PageContent) -> AbstractSet[str]:
+        # Classify before the late fields are parsed so the plan can skip them
+        decided["page"] = classify(early)
+        if classify_only:
+            return frozenset(LATE_FIELDS)
+        if not type_plans:
+            return frozenset()
+        return plan_for(decided["page"].page_type).skip(include_css_topics)
+
+    content = parse_content(fetch.text, limits=limits, profile=profile, skip=_plan_fields)
+    classification = decided["page"]
+    page_type = classification.page_type
+    plan_caps = plan_for(page_type).field_caps if type_plans else None
+    if dedup is not None:
+        canonical = resolve_canonical(fetch.url, content.canonical_url)
+        page_hash = content_simhash(content)
+        hit = dedup.lookup_url(canonical)
+        if hit is not None:
+            dedup.stats.canonical_hits += 1
+            return reuse(hit, fetch.url, "canonical")
+        hit = dedup.lookup_near(page_hash)
+        if hit is not None:
+            dedup.stats.near_hits += 1
+            return reuse(hit, fetch.url, "near-duplicate")
+
+    if classify_only:
+        result = {
+            "url": fetch.url,
+            "page_type": page_type.value,
+            "confidence": classification.confidence,
+            "signals": classification.features.signals,
+        }
+        if dedup is not None:
+            dedup.add(result, (fetch.url, canonical), page_hash)
+        return result
+
+    lang = detect_language(content.lang, fetch.content_language or "", " ".join([content.title, *content.paragraphs[:3]]))
+    if state is not None:
+        # Only sections whose fingerprint changed since the stored run are re-tokenized
+        sections = candidate_sections(content, url=fetch.url, include_css_topics=include_css_topics, profile=profile, structured_fast_path=structured_fast_path, plan_caps=plan_caps)
+        candidates, section_phrases, stats = merge_sections(sections, profile, previous, lang=lang)
+    else:
+        candidates = generate_candidates(content, url=fetch.url, include_css_topics=include_css_topics, profile=profile, structured_fast_path=structured_fast_path, plan_caps=plan_caps, lang=lang)
+    phrases = phrase_stats(candidates, lang)
+    if score_log is not None:
+        score_log.write(fetch.url, page_type.value, lang, profile.source_boosts, phrases)
+    scored = score_phrases(phrases, weights, source_boosts=profile.boosts((weights or DEFAULT_WEIGHTS).source_boosts))
+    top = diversify(scored, limit=top_k, table=phrase_table())
+
+    result = {
         "url": fetch.url,
         "page_type": page_type.value,
+        "confidence": classification.confidence,
+        "language": lang,
         "topics": [
             {"text": t.text, "score": round(float(t.score), 4), "sources": t.sources}
             for t in top
         ],
     }
+    if dedup is not None:
+        dedup.add(result, (fetch.url, canonical), page_hash)
+    if state is not None:
+        state.put(PageState(url=fetch.url, page_fingerprint=page_fp, settings=settings, result=result, top_k=top_k, sections=section_phrases))
+        result = {**result, "incremental": asdict(stats)}
+    return result
+
+
+def _with_render_stats(result: Dict[str, Any], fetch: FetchResult) -> Dict[str, Any]:
+    # Copied so results held by the dedup index/state store stay free of per-fetch stats
+    return {**result, "render": fetch.render} if fetch.render else result
+
+
+def extract_topics(url: str, top_k: int = 8, timeout: float = 8.0, respect_robots: bool = True, render: bool = False, include_css_topics: bool = False, limits: Optional[ParseLimits] = None, profiles: Optional[ProfileRegistry] = None, structured_fast_path: bool = True, state: Optional[StateStore] = None, classify_only: bool = False, type_plans: bool = True, render_options: Optional[RenderOptions] = None, weights: Optional[ScoringWeights] = None) -> Dict[str, Any]:
+    fetch = fetch_url(url, timeout=timeout, respect_robots=respect_robots, render=render, render_options=render_options)
+    result = extract_from_fetch(fetch, top_k=top_k, include_css_topics=include_css_topics, limits=limits, profiles=profiles, structured_fast_path=structured_fast_path, state=state, classify_only=classify_only, type_plans=type_plans, weights=weights)
+    if "error" in result:
+        # Report the URL as requested rather than wherever a failed fetch ended up
+        result["url"] = url
+    return _with_render_stats(result, fetch)
+
+
+def extract_from_archives(paths: Iterable[str], top_k: int = 8, include_css_topics: bool = False, limits: Optional[ParseLimits] = None, profiles: Optional[ProfileRegistry] = None, structured_fast_path: bool = True, state: Optional[StateStore] = None, dedup: Optional[DuplicateIndex] = None, classify_only: bool = False, type_plans: bool = True, weights: Optional[ScoringWeights] = None, score_log: Optional[ScoreInputLog] = None) -> Iterator[Dict[str, Any]]:
+    """Extract topics from WARC files and saved HTML without touching the network."""
+    for fetch in iter_records(paths):
+        if dedup is not None:
+            dedup.stats.pages += 1
+        yield extract_from_fetch(fetch, top_k=top_k, include_css_topics=include_css_topics, limits=limits, profiles=profiles, structured_fast_path=structured_fast_path, state=state, dedup=dedup, classify_only=classify_only, type_plans=type_plans, weights=weights, score_log=score_log)
+
+
+def extract_batch(urls: Iterable[str], top_k: int = 8, timeout: float = 8.0, respect_robots: bool = True, render: bool = False, include_css_topics: bool = False, limits: Optional[ParseLimits] = None, profiles: Optional[ProfileRegistry] = None, structured_fast_path: bool = True, state: Optional[StateStore] = None, dedup: Optional[DuplicateIndex] = None, classify_only: bool = False, type_plans: bool = True, scheduler: Optional[HostScheduler] = None, render_options: Optional[RenderOptions] = None, weights: Optional[ScoringWeights] = None, score_log: Optional[ScoreInputLog] = None) -> Iterator[Dict[str, Any]]:
+    """Extract topics for a list of URLs, reusing results for duplicate and near-duplicate pages.
+
+    With a ``scheduler`` pages are fetched concurrently across hosts and results
+    come back in completion order; parsing and scoring stay on the calling thread.
+    """
+    kwargs = dict(top_k=top_k, include_css_topics=include_css_topics, limits=limits, profiles=profiles, structured_fast_path=structured_fast_path, state=state, dedup=dedup, classify_only=classify_only, type_plans=type_plans, weights=weights, score_log=score_log)
+    if scheduler is not None:
+        yield from _extract_scheduled(urls, scheduler, dict(timeout=timeout, respect_robots=respect_robots, render=render, render_options=render_options), kwargs)
+        return
+    for url in urls:
+        if dedup is not None:
+            dedup.stats.pages += 1
+            # Parameter/mirror variants of a URL already processed skip the fetch entirely
+            hit = dedup.lookup_url(url)
+            if hit is not None:
+                dedup.stats.url_hits += 1
+                yield reuse(hit, url, "url")
+                continue
+        fetch = fetch_url(url, timeout=timeout, respect_robots=respect_robots, render=render, render_options=render_options)
+        result = extract_from_fetch(fetch, **kwargs)
+        if "error" in result:
+            result["url"] = url
+        yield _with_render_stats(result, fetch)
+
+
+def _extract_scheduled(urls: Iterable[str], scheduler: HostScheduler, fetch_kwargs: Dict[str, Any], kwargs: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    dedup: Optional[DuplicateIndex] = kwargs["dedup"]
+    # URL variants wait for the first of their group: only one URL per group is fetched at a time
+    followers: Dict[str, List[str]] = {}
+    hits: Deque[Dict[str, Any]] = deque()
 
+    def fresh(source: Iterable[str]) -> Iterator[str]:
+        # Runs as the scheduler reads its input, so URLs are grouped chunk by chunk
+        for url in source:
+            if dedup is not None:
+                dedup.stats.pages += 1
+                hit = dedup.lookup_url(url)
+                if hit is not None:
+                    dedup.stats.url_hits += 1
+                    hits.append(reuse(hit, url, "url"))
+                    continue
+                key = dedup.canonical(url)
+                if key in followers:
+                    followers[key].append(url)
+                    continue
+                followers[key] = []
+            yield url
 
+    batch: Optional[Iterable[str]] = fresh(urls)
+    while batch is not None:
+        retry: List[str] = []
+        for url, fetch in scheduler.run(batch, **fetch_kwargs):
+            result = extract_from_fetch(fetch, **kwargs)
+            if "error" in result:
+                result["url"] = url
+            yield _with_render_stats(result, fetch)
+            if dedup is not None:
+                key = dedup.canonical(url)
+                group = followers.pop(key, [])
+                if "error" not in result:
+                    for other in group:
+                        dedup.stats.url_hits += 1
+                        yield reuse(result, other, "url")
+                elif group:
+                    # A failed fetch says nothing about its variants: the next one is fetched in its place
+                    followers[key] = group[1:]
+                    retry.append(group[0])
+            while hits:
+                yield hits.popleft()
+        while hits:
+            yield hits.popleft()
+        batch = retry or None
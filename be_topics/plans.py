@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet
+
+from .classifier import PageType
+
+
+@dataclass
+class ExtractionPlan:
+    """Which late PageContent fields a page type needs, and how many entries per source to read."""
+    name: str
+    skip_fields: FrozenSet[str] = frozenset()  # parser.LATE_FIELDS left unparsed
+    field_caps: Dict[str, int] = field(default_factory=dict)  # override profile caps per source
+
+    def skip(self, include_css_topics: bool = False) -> FrozenSet[str]:
+        if include_css_topics:
+            return self.skip_fields - {"semantic_classes", "semantic_ids"}
+        return self.skip_fields
+
+
+# highlighted_texts is not a candidate source; CSS tokens only matter with --css-topics
+_NEVER_USED = frozenset({"highlighted_texts", "semantic_classes", "semantic_ids"})
+
+PRODUCT_PLAN = ExtractionPlan(
+    name="product",
+    skip_fields=_NEVER_USED | {"input_placeholders"},
+    # Bullets/specs carry the product; long descriptions and nav lists mostly repeat them
+    field_caps={"body": 3, "bullet": 20, "spec": 30, "li": 10, "a": 10, "placeholder": 0},
+)
+
+ARTICLE_PLAN = ExtractionPlan(
+    name="article",
+    skip_fields=_NEVER_USED | {"anchor_texts", "input_placeholders"},
+    field_caps={"body": 8, "bullet": 0, "spec": 0, "li": 10, "a": 0, "button": 0, "placeholder": 0, "alt": 5},
+)
+
+NEWS_PLAN = ExtractionPlan(name="news", skip_fields=ARTICLE_PLAN.skip_fields, field_caps=ARTICLE_PLAN.field_caps)
+
+# Sparse/unknown pages keep every source; they rely on lists, anchors and buttons
+OTHER_PLAN = ExtractionPlan(name="other", skip_fields=_NEVER_USED)
+
+PLANS: Dict[PageType, ExtractionPlan] = {
+    PageType.PRODUCT: PRODUCT_PLAN,
+    PageType.ARTICLE: ARTICLE_PLAN,
+    PageType.NEWS: NEWS_PLAN,
+    PageType.OTHER: OTHER_PLAN,
+}
+
+
+def plan_for(page_type: PageType) -> ExtractionPlan:
+    return PLANS.get(page_type, OTHER_PLAN)
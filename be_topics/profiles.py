@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
+from urllib.parse import urlparse
+
+
+# Generic e-commerce/navigation noise tokens and phrases
+ECOM_NOISE_TOKENS = {
+    "amazon","com","hello","sign","account","lists","returns","orders","cart","all",
+    "today","deals","prime","video","registry","customer","service","gift","cards",
+    "sell","home","kitchen","share","sponsored","learn","more","search","shift","alt",
+    "view","history","keyboard","shortcuts","add","buying","options","compare","similar",
+    "items","previous","next","set","slides","ratings","stars","price","prices","usd",
+    "deliver","delivery","india","united","states","watch","now","download","pdf","link",
+}
+ECOM_NOISE_PHRASES = {
+    "add to cart","buying options","compare with similar","keyboard shortcuts","hello sign in",
+    "returns & orders","gift cards","customer service","today's deals","prime video","0 cart",
+    "see more product details","report an issue","product description","product information",
+    "warranty & support","from the manufacturer","user manual","visit the store","learn more",
+}
+ECOM_HEADING_NOISE = {
+    "feedback","price","product description","product information","options available",
+    "keyboard shortcuts","customers who viewed this item also viewed","similar brands on amazon",
+    "warranty & support","product videos","product guidance & documents","from the manufacturer",
+    "top brand","safety documents","image unavailable","sorry, there was a problem",
+    "product summary","about this item","deals on related products","brands you might like",
+}
+
+# Wikipedia/navigation/UI specific noise
+WIKI_NOISE_TOKENS = {
+    "edit","jump","navigation","sidebar","toc","table","contents","toggle","subsection",
+    "move","hide","show","top","category","talk","read","view","history","source",
+    "wikipedia","wikidata","mediawiki",
+}
+WIKI_NOISE_PHRASES = {
+    "move to sidebar","table of contents","edit this at wikidata","toggle subsection",
+    "download as pdf","printable version","permanent link","page information","cite this page",
+}
+WIKI_NOISE_SUBSTRINGS = ("wikipedia", "wikidata", "mediawiki")
+WIKI_HEADING_NOISE = {
+    "personal life","career","early life","references","external links","see also",
+    "bibliography","notes","further reading","works","media","writing","filmography",
+}
+
+# Per-source caps on how many entries generate_candidates reads
+DEFAULT_FIELD_CAPS = {
+    "h": 5, "body": 6, "bullet": 12, "spec": 20, "alt": 10, "li": 20, "a": 30,
+    "button": 10, "placeholder": 10, "class": 20, "id": 10, "jsonld": 12,
+}
+
+
+@dataclass
+class SiteProfile:
+    """Site-specific extraction rules, compiled once when the profile is built.
+
+    ``hosts`` entries are either a domain suffix (``wikipedia.org`` matches every
+    subdomain) or a ``label.*`` wildcard (``amazon.*`` matches ``www.amazon.co.uk``).
+    """
+    name: str
+    hosts: List[str] = field(default_factory=list)
+    title_strip: List[str] = field(default_factory=list)  # regexes removed from titles, in order
+    bullet_ids: List[str] = field(default_factory=list)  # container id regexes holding <li> bullets
+    bullet_headings: List[str] = field(default_factory=list)  # heading regexes followed by a bullet <ul>
+    spec_ids: List[str] = field(default_factory=list)  # container id regexes holding spec tables
+    price_selector: str = ""  # CSS selector for visible price spans
+    meta_skip: str = ""  # skip meta description when it matches this regex
+    drop_tokens: Iterable[str] = field(default_factory=set)  # removed before n-gramming
+    noise_tokens: Iterable[str] = field(default_factory=set)  # phrases dominated by these are dropped
+    noise_phrases: Iterable[str] = field(default_factory=set)
+    noise_substrings: Iterable[str] = field(default_factory=tuple)
+    heading_noise: Iterable[str] = field(default_factory=set)
+    field_caps: Dict[str, int] = field(default_factory=dict)
+    source_boosts: Dict[str, float] = field(default_factory=dict)
+    ignore_params: List[str] = field(default_factory=list)  # query params that never change the page; "pd_rd_*" globs
+
+    def __post_init__(self) -> None:
+        self.title_res: Tuple[Pattern[str], ...] = tuple(re.compile(p, re.I) for p in self.title_strip)
+        self.bullet_id_res: Tuple[Pattern[str], ...] = tuple(re.compile(p, re.I) for p in self.bullet_ids)
+        self.bullet_heading_res: Tuple[Pattern[str], ...] = tuple(re.compile(p, re.I) for p in self.bullet_headings)
+        self.spec_id_res: Tuple[Pattern[str], ...] = tuple(re.compile(p, re.I) for p in self.spec_ids)
+        self.meta_skip_re: Optional[Pattern[str]] = re.compile(self.meta_skip, re.I) if self.meta_skip else None
+        self.drop_tokens = frozenset(t.lower() for t in self.drop_tokens)
+        self.noise_tokens = frozenset(t.lower() for t in self.noise_tokens)
+        self.noise_phrases = frozenset(p.lower() for p in self.noise_phrases)
+        self.noise_substrings = tuple(s.lower() for s in self.noise_substrings)
+        self.heading_noise = tuple(s.lower() for s in self.heading_noise)
+        self.caps: Dict[str, int] = {**DEFAULT_FIELD_CAPS, **self.field_caps}
+        self.ignore_param_names: FrozenSet[str] = frozenset(p.lower() for p in self.ignore_params if not p.endswith("*"))
+        self.ignore_param_prefixes: Tuple[str, ...] = tuple(p[:-1].lower() for p in self.ignore_params if p.endswith("*"))
+        self.digest = self._digest()
+
+    def _digest(self) -> str:
+        """Stable hash of every rule, so stored state notices when a profile's contents change."""
+        data: Dict[str, Any] = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            # Sets (and the tuples built from them) match in any order; lists are ordered rules
+            data[f.name] = sorted(value) if isinstance(value, (frozenset, set, tuple)) else value
+        return hashlib.blake2b(json.dumps(data, sort_keys=True).encode("utf-8"), digest_size=12).hexdigest()
+
+    def ignores_param(self, name: str) -> bool:
+        n = name.lower()
+        return n in self.ignore_param_names or n.startswith(self.ignore_param_prefixes)
+
+    def cap(self, source: str) -> int:
+        return self.caps.get(source, 0)
+
+    def boosts(self, base: Dict[str, float]) -> Dict[str, float]:
+        if not self.source_boosts:
+            return base
+        return {**base, **self.source_boosts}
+
+    def clean_title(self, title: str) -> str:
+        t = title.strip()
+        for pat in self.title_res:
+            t = pat.sub("", t)
+        return t.strip()
+
+
+AMAZON = SiteProfile(
+    name="amazon",
+    hosts=["amazon.*"],
+    # Drop leading "Amazon.com :" prefix and trailing department segment after colon
+    title_strip=[r"^amazon(?:\.\w+)?\s*:\s*", r"\s*:\s*[^:]+$"],
+    bullet_ids=[r"feature-bullets|featurebullets"],
+    bullet_headings=[r"about this item"],
+    spec_ids=[
+        r"productDetails_techSpec_section_1",
+        r"productDetails_detailBullets_sections1",
+        r"productOverview_feature_div",
+    ],
+    price_selector="span.a-offscreen, span.a-color-price, span.p13n-sc-price",
+    meta_skip=r"amazon|online shopping",
+    drop_tokens=ECOM_NOISE_TOKENS,
+    noise_tokens=ECOM_NOISE_TOKENS,
+    noise_phrases=ECOM_NOISE_PHRASES,
+    heading_noise=ECOM_HEADING_NOISE,
+    # Search/ranking/tracking parameters on product URLs (ref=, qid=, th=, ...)
+    ignore_params=[
+        "ref", "ref_", "qid", "th", "psc", "sr", "s", "ie", "crid", "sprefix",
+        "dib", "dib_tag", "content-id", "smid", "spla", "pd_rd_*", "pf_rd_*",
+    ],
+)
+
+WIKIPEDIA = SiteProfile(
+    name="wikipedia",
+    hosts=["wikipedia.org", "wikimedia.org", "wiktionary.org", "wikidata.org", "mediawiki.org"],
+    title_strip=[r"\s*[\-\–]\s*wikipedia.*$"],
+    noise_tokens=WIKI_NOISE_TOKENS,
+    noise_phrases=WIKI_NOISE_PHRASES,
+    noise_substrings=WIKI_NOISE_SUBSTRINGS,
+    heading_noise=WIKI_HEADING_NOISE,
+)
+
+# Unmatched hosts run no site-specific selectors or vocabularies
+DEFAULT = SiteProfile(name="default")
+
+
+class ProfileRegistry:
+    """Host → profile dispatch through dict lookups over the host's labels."""
+
+    def __init__(self, profiles: Iterable[SiteProfile] = (), default: SiteProfile = DEFAULT, cache_size: int = 10000) -> None:
+        self.default = default
+        self._suffix: Dict[str, SiteProfile] = {}
+        self._label: Dict[str, SiteProfile] = {}
+        self._cache: Dict[str, SiteProfile] = {}
+        self._cache_size = cache_size
+        for p in profiles:
+            self.register(p)
+
+    def register(self, profile: SiteProfile) -> None:
+        for pattern in profile.hosts:
+            pattern = pattern.lower().lstrip(".")
+            if pattern.endswith(".*"):
+                self._label[pattern[:-2]] = profile
+            else:
+                self._suffix[pattern] = profile
+        self._cache.clear()
+
+    def lookup(self, host: str) -> SiteProfile:
+        host = (host or "").lower().rstrip(".")
+        hit = self._cache.get(host)
+        if hit is not None:
+            return hit
+        labels = host.split(".")
+        profile = self.default
+        # Most specific suffix wins; a wildcard label must not be the TLD itself
+        for i in range(len(labels)):
+            found = self._suffix.get(".".join(labels[i:]))
+            if found is None and i < len(labels) - 1:
+                found = self._label.get(labels[i])
+            if found is not None:
+                profile = found
+                break
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[host] = profile
+        return profile
+
+    def for_url(self, url: str) -> SiteProfile:
+        return self.lookup(urlparse(url).hostname or "")
+
+
+BUILTIN_PROFILES = (AMAZON, WIKIPEDIA)
+DEFAULT_REGISTRY = ProfileRegistry(BUILTIN_PROFILES)
+
+# Config keys naming the built-in vocabularies, so JSON profiles can reuse them
+_VOCABULARIES: Dict[str, Any] = {
+    "@ecom_noise_tokens": ECOM_NOISE_TOKENS,
+    "@ecom_noise_phrases": ECOM_NOISE_PHRASES,
+    "@ecom_heading_noise": ECOM_HEADING_NOISE,
+    "@wiki_noise_tokens": WIKI_NOISE_TOKENS,
+    "@wiki_noise_phrases": WIKI_NOISE_PHRASES,
+    "@wiki_noise_substrings": WIKI_NOISE_SUBSTRINGS,
+    "@wiki_heading_noise": WIKI_HEADING_NOISE,
+}
+
+
+def _expand(values: Any) -> Any:
+    if not isinstance(values, list):
+        return values
+    out: List[str] = []
+    for v in values:
+        out.extend(_VOCABULARIES.get(v, [v]))
+    return out
+
+
+def profile_from_dict(data: Dict[str, Any]) -> SiteProfile:
+    unknown = set(data) - {f.name for f in fields(SiteProfile)}
+    if unknown:
+        raise ValueError(f"unknown site profile keys: {', '.join(sorted(unknown))}")
+    return SiteProfile(**{k: _expand(v) for k, v in data.items()})
+
+
+def load_profiles(path: str, include_builtin: bool = True) -> ProfileRegistry:
+    """Build a registry from a JSON config: ``{"default": {...}, "profiles": [{...}, ...]}``.
+
+    List values may name a built-in vocabulary such as ``"@ecom_noise_tokens"``.
+    Config profiles are registered after the built-ins, so they win on overlapping hosts.
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        cfg = json.load(fh)
+    default = profile_from_dict({"name": "default", **cfg["default"]}) if "default" in cfg else DEFAULT
+    profiles: List[SiteProfile] = list(BUILTIN_PROFILES) if include_builtin else []
+    profiles.extend(profile_from_dict(p) for p in cfg.get("profiles", []))
+    return ProfileRegistry(profiles, default=default)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import gzip
+import json
+import time
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+
+from .scoring import DEFAULT_WEIGHTS, ScoredTopic, ScoringWeights, PhraseStats, diversify
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+
+class ScoreInputLog:
+    """JSON lines of per-page PhraseStats, stored column-wise (``.gz`` paths are compressed).
+
+    One record per scored page: ``url``, ``page_type``, ``language``, ``boosts``
+    (the site profile's source boost overrides), the phrase columns ``text``,
+    ``tf``, ``n_words``, ``model``, ``unit``, the page's ``sources`` names and
+    ``entries``: flat ``[row, source index, count, ...]`` triples.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.pages = 0
+        self._fh = _open(path, "w")
+
+    def write(self, url: str, page_type: str, lang: str, boosts: Dict[str, float], phrases: List[PhraseStats]) -> None:
+        names: Dict[str, int] = {}
+        entries: List[int] = []
+        for row, p in enumerate(phrases):
+            for src, count in p.sources.items():
+                entries.extend((row, names.setdefault(src, len(names)), count))
+        record = {
+            "url": url,
+            "page_type": page_type,
+            "language": lang,
+            "boosts": boosts,
+            "text": [p.text for p in phrases],
+            "tf": [p.tf for p in phrases],
+            "n_words": [p.n_words for p in phrases],
+            "model": [int(p.model) for p in phrases],
+            "unit": [int(p.unit) for p in phrases],
+            "sources": list(names),
+            "entries": entries,
+        }
+        self._fh.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.pages += 1
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def iter_score_inputs(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        with _open(path, "r") as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _score_batch(records: List[Dict[str, Any]], weights: ScoringWeights, top_k: int, stats: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    import numpy as np
+
+    # Flatten the batch: one row per phrase, one (row, source, count) entry per source count
+    src_index: Dict[str, int] = {}
+    page_entries: List[Any] = []  # per page: local (row, source, count) triples
+    entry_rows: List[Any] = []
+    entry_srcs: List[Any] = []
+    offsets = [0]
+    for record in records:
+        entries = np.asarray(record["entries"], dtype=np.int64).reshape(-1, 3)
+        mapping = np.asarray([src_index.setdefault(name, len(src_index)) for name in record["sources"]], dtype=np.int64)
+        page_entries.append(entries)
+        entry_rows.append(entries[:, 0] + offsets[-1])
+        entry_srcs.append(mapping[entries[:, 1]])
+        offsets.append(offsets[-1] + len(record["tf"]))
+    n_rows = offsets[-1]
+    stats["phrases"] += n_rows
+    if n_rows == 0:
+        scores = np.zeros(0)
+    else:
+        tf = np.fromiter((v for r in records for v in r["tf"]), dtype=np.float64, count=n_rows)
+        words = np.fromiter((v for r in records for v in r["n_words"]), dtype=np.int64, count=n_rows)
+        model = np.fromiter((v for r in records for v in r["model"]), dtype=bool, count=n_rows)
+        unit = np.fromiter((v for r in records for v in r["unit"]), dtype=bool, count=n_rows)
+        row_page = np.repeat(np.arange(len(records)), np.diff(offsets))
+        # Per-page boost vectors: the weights' source boosts with the profile overrides on top
+        base = np.array([weights.source_boosts.get(src, 0.0) for src in src_index], dtype=np.float64)
+        page_boosts = np.tile(base, (len(records), 1))
+        for page, record in enumerate(records):
+            for src, value in (record.get("boosts") or {}).items():
+                if src in src_index:
+                    page_boosts[page, src_index[src]] = value
+        rows = np.concatenate(entry_rows)
+        srcs = np.concatenate(entry_srcs)
+        counts = np.concatenate([e[:, 2] for e in page_entries]).astype(np.float64)
+        # bincount adds each row's entries in input order, matching score_phrases' sum
+        boost = np.bincount(rows, weights=page_boosts[row_page[rows], srcs] * counts, minlength=n_rows)
+        length_table = np.full(int(words.max()) + 1, weights.other_length_boost)
+        for n, value in weights.length_boosts.items():
+            if 0 <= n < len(length_table):
+                length_table[n] = value
+        scores = tf * (1.0 + boost) * length_table[words]
+        scores = np.where(model, scores * weights.model_boost, scores)
+        scores = np.where(unit, scores * weights.unit_boost, scores)
+
+    for page, record in enumerate(records):
+        start, end = offsets[page], offsets[page + 1]
+        texts, names, entries = record["text"], record["sources"], page_entries[page]
+        bounds = np.searchsorted(entries[:, 0], np.arange(end - start + 1)).tolist()
+
+        def sources(i: int) -> Dict[str, int]:
+            return {names[s]: int(c) for _, s, c in entries[bounds[i] : bounds[i + 1]].tolist()}
+
+        # Stable descending order keeps ties in generation order, as list.sort(reverse=True) does
+        order = np.argsort(-scores[start:end], kind="stable").tolist()
+        page_scores = scores[start:end].tolist()
+        ranked = (ScoredTopic(text=texts[i], score=page_scores[i], sources=sources(i)) for i in order)
+        top = diversify(ranked, limit=top_k)
+        yield {
+            "url": record["url"],
+            "page_type": record.get("page_type"),
+            "language": record.get("language"),
+            "topics": [{"text": t.text, "score": round(t.score, 4), "sources": t.sources} for t in top],
+        }
+
+
+def rescore(paths: Iterable[str], weights: Optional[ScoringWeights] = None, top_k: int = 8, batch_pages: int = 5000, stats: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Re-rank logged pages under ``weights`` without fetching or parsing.
+
+    Scores for ``batch_pages`` pages at a time are computed as numpy arrays.
+    ``stats`` (if given) is filled with page/phrase counts and elapsed seconds.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    stats = stats if stats is not None else {}
+    stats.update(pages=0, phrases=0, seconds=0.0)
+    started = time.perf_counter()
+    batch: List[Dict[str, Any]] = []
+    for record in iter_score_inputs(paths):
+        batch.append(record)
+        if len(batch) >= batch_pages:
+            stats["pages"] += len(batch)
+            yield from _score_batch(batch, weights, top_k, stats)
+            batch = []
+    if batch:
+        stats["pages"] += len(batch)
+        yield from _score_batch(batch, weights, top_k, stats)
+    stats["seconds"] = round(time.perf_counter() - started, 3)
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .fetcher import FetchResult, fetch_url
+
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+# Statuses that say the host (not the page) is in trouble or pushing back
+HOST_FAILURE_STATUSES = {403, 429, 500, 502, 503, 504}
+
+
+def host_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def is_host_failure(result: FetchResult) -> bool:
+    if result.status_code in HOST_FAILURE_STATUSES:
+        return True
+    # Connection errors and timeouts come back as status 0
+    return result.status_code == 0 and result.error is not None and not result.error.startswith("render-failed")
+
+
+@dataclass
+class HostStats:
+    host: str
+    requests: int = 0
+    ok: int = 0
+    errors: int = 0
+    blocked: int = 0  # 403/429
+    timeouts: int = 0
+    circuit_skipped: int = 0  # URLs failed fast while the circuit was open
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    ewma_seconds: float = 0.0
+    consecutive_failures: int = 0
+    trips: int = 0
+    state: str = CLOSED
+    reopen_at: float = 0.0
+    in_flight: int = 0
+    queue: Deque[str] = field(default_factory=deque)
+    last_dispatch: int = 0
+    version: int = 0  # bumped on every re-key in the scheduler's ready heap
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "ok": self.ok,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.requests, 3) if self.requests else 0.0,
+            "blocked": self.blocked,
+            "timeouts": self.timeouts,
+            "circuit_skipped": self.circuit_skipped,
+            "circuit": self.state,
+            "trips": self.trips,
+            "mean_seconds": round(self.total_seconds / self.requests, 3) if self.requests else 0.0,
+            "ewma_seconds": round(self.ewma_seconds, 3),
+            "max_seconds": round(self.max_seconds, 3),
+        }
+
+
+class HostScheduler:
+    """Fetches a URL list on a thread pool, spreading work across hosts.
+
+    - At most ``per_host`` requests per host are in flight; the next host is the
+      least recently served one, with slow hosts (latency EWMA above
+      ``slow_seconds``) served only after healthy ones and without retries.
+    - ``failure_threshold`` consecutive host failures (403/429/5xx, timeouts,
+      connection errors) open the host's circuit for ``cooldown`` seconds; one
+      probe is then let through (half-open). A successful probe closes the circuit.
+      After ``max_trips`` openings the host's remaining URLs fail fast.
+    - Hosts with work wait in a heap keyed by the time they may next be served,
+      so a dispatch costs O(log hosts). URLs are read from the input as the
+      queues drain, at most ``max_queued`` at a time.
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        per_host: int = 2,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        max_trips: int = 2,
+        slow_seconds: float = 4.0,
+        fetch: Callable[..., FetchResult] = fetch_url,
+        max_queued: int = 1000,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.per_host = max(1, per_host)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_trips = max_trips
+        self.slow_seconds = slow_seconds
+        self.fetch = fetch
+        self.max_queued = max(self.workers, max_queued)
+        self.hosts: Dict[str, HostStats] = {}
+        self._ticks = itertools.count(1)
+        # (ready_at, slow, in_flight, last_dispatch, version, host); entries whose
+        # version is behind the host's are stale and dropped when popped
+        self._ready: List[Tuple[float, bool, int, int, int, str]] = []
+        self._queued = 0
+
+    def _host(self, host: str) -> HostStats:
+        stats = self.hosts.get(host)
+        if stats is None:
+            stats = self.hosts[host] = HostStats(host=host)
+        return stats
+
+    def _is_slow(self, stats: HostStats) -> bool:
+        return stats.requests > 0 and stats.ewma_seconds > self.slow_seconds
+
+    def _is_dead(self, stats: HostStats) -> bool:
+        return stats.state == OPEN and stats.trips >= self.max_trips
+
+    def _schedule(self, stats: HostStats) -> None:
+        """Re-key the host in the ready heap after its queue, load or circuit changed."""
+        stats.version += 1
+        if not stats.queue or stats.in_flight >= self.per_host or self._is_dead(stats):
+            return
+        if stats.state == HALF_OPEN and stats.in_flight:
+            # A single probe at a time
+            return
+        ready_at = stats.reopen_at if stats.state == OPEN else 0.0
+        entry = (ready_at, self._is_slow(stats), stats.in_flight, stats.last_dispatch, stats.version, stats.host)
+        heapq.heappush(self._ready, entry)
+
+    def _next(self, now: float) -> Optional[HostStats]:
+        while self._ready:
+            ready_at, _, _, _, version, host = self._ready[0]
+            stats = self.hosts[host]
+            if version != stats.version:
+                heapq.heappop(self._ready)
+                continue
+            if ready_at > now:
+                return None
+            heapq.heappop(self._ready)
+            if stats.state == OPEN:
+                stats.state = HALF_OPEN
+                if stats.in_flight:
+                    # Requests from before the trip are still out; re-keyed when they finish
+                    continue
+            return stats
+        return None
+
+    def _enqueue(self, url: str) -> Iterator[Tuple[str, FetchResult]]:
+        stats = self._host(host_of(url))
+        if self._is_dead(stats):
+            stats.queue.append(url)
+            yield from self._fail_fast(stats)
+            return
+        stats.queue.append(url)
+        self._queued += 1
+        if len(stats.queue) == 1:
+            self._schedule(stats)
+
+    def _record(self, stats: HostStats, result: FetchResult, seconds: float) -> None:
+        stats.in_flight -= 1
+        stats.requests += 1
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        stats.ewma_seconds = seconds if stats.requests == 1 else 0.7 * stats.ewma_seconds + 0.3 * seconds
+        if result.status_code in (403, 429):
+            stats.blocked += 1
+        if result.status_code == 0 and result.error and "timed out" in result.error.lower():
+            stats.timeouts += 1
+        if result.error is None:
+            stats.ok += 1
+        else:
+            stats.errors += 1
+        if not is_host_failure(result):
+            stats.consecutive_failures = 0
+            if stats.state == HALF_OPEN:
+                stats.state = CLOSED
+            return
+        stats.consecutive_failures += 1
+        if stats.state == HALF_OPEN or stats.consecutive_failures >= self.failure_threshold:
+            stats.state = OPEN
+            stats.trips += 1
+            # Back off harder each time the host trips
+            stats.reopen_at = time.monotonic() + self.cooldown * stats.trips
+
+    def _fail_fast(self, stats: HostStats) -> Iterator[Tuple[str, FetchResult]]:
+        while stats.queue:
+            url = stats.queue.popleft()
+            stats.circuit_skipped += 1
+            yield url, FetchResult(url=url, status_code=0, content_type="", text=None, error=f"circuit-open: {stats.host}")
+
+    def run(self, urls: Iterable[str], **fetch_kwargs: Any) -> Iterator[Tuple[str, FetchResult]]:
+        """Yield ``(requested_url, FetchResult)`` in completion order; ``fetch_kwargs`` go to every fetch."""
+        source: Optional[Iterator[str]] = iter(urls)
+        pending: Dict[Future, Tuple[HostStats, str, float]] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                while source is not None and self._queued < self.max_queued:
+                    url = next(source, None)
+                    if url is None:
+                        source = None
+                        break
+                    yield from self._enqueue(url)
+                now = time.monotonic()
+                while len(pending) < self.workers:
+                    stats = self._next(now)
+                    if stats is None:
+                        break
+                    url = stats.queue.popleft()
+                    self._queued -= 1
+                    stats.in_flight += 1
+                    stats.last_dispatch = next(self._ticks)
+                    kwargs = dict(fetch_kwargs)
+                    if self._is_slow(stats) or stats.state == HALF_OPEN:
+                        # Retries on a struggling host only hold a worker longer
+                        kwargs["max_retries"] = 0
+                    pending[pool.submit(self.fetch, url, **kwargs)] = (stats, url, time.monotonic())
+                    self._schedule(stats)
+                if not pending:
+                    if not self._ready:
+                        if source is None:
+                            return
+                        continue
+                    # Only cooling-down hosts have work left
+                    time.sleep(max(0.0, min(self._ready[0][0] - time.monotonic(), self.cooldown)) + 0.01)
+                    continue
+                done, _ = wait(list(pending), timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats, url, started = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = FetchResult(url=url, status_code=0, content_type="", text=None, error=str(e))
+                    self._record(stats, result, time.monotonic() - started)
+                    yield url, result
+                    if self._is_dead(stats):
+                        self._queued -= len(stats.queue)
+                        yield from self._fail_fast(stats)
+                    self._schedule(stats)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host latency/error stats, slowest hosts first."""
+        ordered: List[HostStats] = sorted(self.hosts.values(), key=lambda s: -s.ewma_seconds)
+        return {s.host: s.to_dict() for s in ordered}
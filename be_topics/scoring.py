@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+import json
 import math
-from collections import Counter, defaultdict
-import re
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 from .candidates import Candidate
-from nltk.stem import PorterStemmer
+from .intern import PhraseTable, _canon, phrase_table
+from .language import ENGLISH, get_language
+from .lexicon import stem
 
 
 SourceBoost = {
@@ -34,108 +35,156 @@ SourceBoost = {
 }
 
 
+@dataclass
+class ScoringWeights:
+    """Every multiplier score_phrases applies; the defaults are the built-in tuning."""
+    source_boosts: Dict[str, float] = field(default_factory=lambda: dict(SourceBoost))
+    # N-gram length boost to prefer 2-3 word phrases
+    length_boosts: Dict[int, float] = field(default_factory=lambda: {1: 0.8, 2: 1.2, 3: 1.4})
+    other_length_boost: float = 1.0
+    model_boost: float = 1.35
+    unit_boost: float = 1.2
+
+    def length_boost(self, n_words: int) -> float:
+        return self.length_boosts.get(n_words, self.other_length_boost)
+
+
+DEFAULT_WEIGHTS = ScoringWeights()
+
+
+def weights_from_dict(data: Dict[str, Any]) -> ScoringWeights:
+    """Overrides on top of the defaults; ``source_boosts``/``length_boosts`` merge key by key."""
+    unknown = set(data) - {f.name for f in fields(ScoringWeights)}
+    if unknown:
+        raise ValueError(f"unknown scoring weights: {', '.join(sorted(unknown))}")
+    weights = ScoringWeights()
+    weights.source_boosts.update({k: float(v) for k, v in data.get("source_boosts", {}).items()})
+    weights.length_boosts.update({int(k): float(v) for k, v in data.get("length_boosts", {}).items()})
+    for name in ("other_length_boost", "model_boost", "unit_boost"):
+        if name in data:
+            setattr(weights, name, float(data[name]))
+    return weights
+
+
+def load_weights(path: str) -> ScoringWeights:
+    """Read a JSON weights file: ``{"source_boosts": {"title": 3.0}, "length_boosts": {"1": 0.6}, ...}``."""
+    with open(path, "r", encoding="utf-8") as fh:
+        return weights_from_dict(json.load(fh))
+
+
 @dataclass
 class ScoredTopic:
     text: str
     score: float
     sources: Dict[str, int]
+    pid: int = field(default=-1, repr=False)  # PhraseTable ID, valid while the page is being scored
 
 
-def _compute_tf(candidates: List[Candidate]) -> Dict[str, float]:
-    # print(f"Computing TF for {len(candidates)} candidates: \n\n\n{candidates}\n\n\n")
-    stemmer = PorterStemmer()
-
-    def key(s: str) -> str:
-        tokens = s.lower().split()
-        # Stem only alpha tokens; keep digits/models unchanged
-        norm = [stemmer.stem(t) if t.isalpha() and len(t) > 2 else t for t in tokens]
-        return " ".join(norm)
-    counts = Counter(key(c.text) for c in candidates)
-    total = sum(counts.values()) or 1
-    # Map back to display text by picking one representative per key
-    rep_map: Dict[str, str] = {}
-    for c in candidates:
-        k = key(c.text)
-        if k not in rep_map:
-            rep_map[k] = c.text
-    return {rep_map[t]: c / total for t, c in counts.items()}
-
-
-def _boost_from_sources(candidates: List[Candidate]) -> Dict[str, Dict[str, int]]:
-    stemmer = PorterStemmer()
-    def key(s: str) -> str:
-        tokens = s.lower().split()
-        norm = [stemmer.stem(t) if t.isalpha() and len(t) > 2 else t for t in tokens]
-        return " ".join(norm)
-    # Group sources by stemmed key
-    rep_map: Dict[str, str] = {}
-    for c in candidates:
-        k = key(c.text)
-        if k not in rep_map:
-            rep_map[k] = c.text
-    src_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+@dataclass
+class PhraseStats:
+    """Weight-independent inputs to a phrase's score; what `rescore` replays."""
+    text: str
+    tf: float
+    sources: Dict[str, int]
+    n_words: int
+    model: bool
+    unit: bool
+    pid: int = field(default=-1, repr=False)
+
+
+def _stem_key(s: str, lang: str = ENGLISH) -> str:
+    tokens = s.lower().split()
+    stemmer = stem if lang == ENGLISH else get_language(lang).stem
+    # Stem only alpha tokens; keep digits/models unchanged
+    norm = [stemmer(t) if t.isalpha() and len(t) > 2 else t for t in tokens]
+    return " ".join(norm)
+
+
+def phrase_stats(candidates: List[Candidate], lang: str = ENGLISH, table: Optional[PhraseTable] = None) -> List[PhraseStats]:
+    """TF and per-source counts per stem key, counted on PhraseTable IDs.
+
+    Variants sharing a stem key are merged under the first one seen.
+    """
+    table = table or phrase_table()
+    table.begin_page()
+    counts: Dict[int, int] = {}  # stem key ID → occurrences
+    first: Dict[int, int] = {}  # stem key ID → representative phrase ID
+    src_counts: Dict[int, Dict[str, int]] = {}
     for c in candidates:
-        k = key(c.text)
-        disp = rep_map[k]
-        src_counts[disp][c.source] += 1
-    return src_counts
-
+        pid = table.intern(c.text)
+        kid = table.stem_key(pid, lang)
+        if kid in counts:
+            counts[kid] += 1
+            srcs = src_counts[kid]
+        else:
+            counts[kid] = 1
+            first[kid] = pid
+            srcs = src_counts[kid] = {}
+        srcs[c.source] = srcs.get(c.source, 0) + 1
+    total = sum(counts.values()) or 1
+    stats: List[PhraseStats] = []
+    for kid, count in counts.items():
+        pid = first[kid]
+        n_words, model, unit = table.features(pid)
+        stats.append(PhraseStats(text=table.text(pid), tf=count / total, sources=src_counts[kid], n_words=n_words, model=model, unit=unit, pid=pid))
+    return stats
 
-def score_candidates(candidates: List[Candidate]) -> List[ScoredTopic]:
-    tf = _compute_tf(candidates)
-    src_counts = _boost_from_sources(candidates)
 
+def score_phrases(phrases: List[PhraseStats], weights: Optional[ScoringWeights] = None, source_boosts: Optional[Dict[str, float]] = None) -> List[ScoredTopic]:
+    weights = weights or DEFAULT_WEIGHTS
+    boosts = weights.source_boosts if source_boosts is None else source_boosts
     scored: List[ScoredTopic] = []
-    for phrase, tf_val in tf.items():
-        srcs = src_counts.get(phrase, {})
-        boost = sum(SourceBoost.get(src, 0.0) * count for src, count in srcs.items())
-        # N-gram length boost to prefer 2-3 word phrases
-        n_words = max(1, len(phrase.split()))
-        length_boost = {1: 0.8, 2: 1.2, 3: 1.4}.get(n_words, 1.0)
-        score = tf_val * (1.0 + boost) * length_boost
-        # Category-agnostic product boosts: model patterns and units
-        if re.search(r"\b[A-Z]{2,}\d{2,}\b|\b\d{1,2}(-|\s)?slice\b", phrase):
-            score *= 1.35
-        if re.search(r"\b(\d+(?:\.\d+)?\s?(inch|in|w|v|watts|lbs|pounds))\b", phrase):
-            score *= 1.2
-        scored.append(ScoredTopic(text=phrase, score=score, sources=dict(srcs)))
+    for p in phrases:
+        boost = sum(boosts.get(src, 0.0) * count for src, count in p.sources.items())
+        score = p.tf * (1.0 + boost) * weights.length_boost(p.n_words)
+        if p.model:
+            score *= weights.model_boost
+        if p.unit:
+            score *= weights.unit_boost
+        scored.append(ScoredTopic(text=p.text, score=score, sources=p.sources, pid=p.pid))
 
     scored.sort(key=lambda x: x.score, reverse=True)
     return scored
 
 
-def diversify(scored: List[ScoredTopic], similarity_threshold: float = 0.8) -> List[ScoredTopic]:
-    def _canon(s: str) -> str:
-        s = s.lower().replace('-', ' ')
-        return re.sub(r"\s+", " ", s).strip()
+def score_candidates(candidates: List[Candidate], source_boosts: Optional[Dict[str, float]] = None, lang: str = ENGLISH, weights: Optional[ScoringWeights] = None) -> List[ScoredTopic]:
+    return score_phrases(phrase_stats(candidates, lang), weights, source_boosts)
+
 
-    def jaccard(a: str, b: str) -> float:
-        sa, sb = set(_canon(a).split()), set(_canon(b).split())
-        inter = len(sa & sb)
-        union = len(sa | sb) or 1
-        return inter / union
+def diversify(scored: Iterable[ScoredTopic], similarity_threshold: float = 0.8, limit: Optional[int] = None, table: Optional[PhraseTable] = None) -> List[ScoredTopic]:
+    """Drop near-duplicates of higher-scored topics; stops once ``limit`` topics are kept.
 
+    Topics carrying a ``pid`` reuse the canonical forms cached in ``table``.
+    """
     selected: List[ScoredTopic] = []
+    # Canonical text, word set and title flag of each kept topic, computed once
+    kept: List[Tuple[str, FrozenSet[str], bool]] = []
     for cand in scored:
+        if table is not None and cand.pid >= 0:
+            ca, sa = table.canon(cand.pid)
+        else:
+            ca = _canon(cand.text)
+            sa = frozenset(ca.split())
+        # Title shingle suppression: if both are primarily from title, keep the earlier (higher score)
+        cand_title = any(k in cand.sources for k in ("title", "og", "twitter"))
         is_dup = False
-        for s in selected:
+        for cb, sb, sel_title in kept:
+            jaccard = len(sa & sb) / (len(sa | sb) or 1)
             # High textual overlap
-            if jaccard(cand.text, s.text) >= similarity_threshold:
+            if jaccard >= similarity_threshold:
                 is_dup = True
                 break
-            ca, cb = _canon(cand.text), _canon(s.text)
             # Subset/superset suppression
             if ca in cb or cb in ca:
                 is_dup = True
                 break
-            # Title shingle suppression: if both are primarily from title, keep the earlier (higher score)
-            cand_title = any(k in cand.sources for k in ("title", "og", "twitter"))
-            sel_title = any(k in s.sources for k in ("title", "og", "twitter"))
-            if cand_title and sel_title and jaccard(cand.text, s.text) >= 0.5:
+            if cand_title and sel_title and jaccard >= 0.5:
                 is_dup = True
                 break
         if not is_dup:
             selected.append(cand)
+            kept.append((ca, sa, cand_title))
+            # Later candidates cannot change what was already kept
+            if limit is not None and len(selected) >= limit:
+                break
     return selected
-
-
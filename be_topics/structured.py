@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from bs4 import BeautifulSoup
+
+
+PRODUCT_TYPES = {"product", "productgroup", "productmodel", "car", "vehicle", "book", "softwareapplication"}
+ARTICLE_TYPES = {"article", "newsarticle", "blogposting", "report", "scholarlyarticle", "techarticle", "reportagenewsarticle", "analysisnewsarticle"}
+NEWS_TYPES = {"newsarticle", "reportagenewsarticle", "analysisnewsarticle"}
+
+_MAX_VALUES = 20  # per field
+_MAX_CHARS = 300  # per value
+_MAX_SCRIPT_CHARS = 200_000
+_LD_TYPE_RE = re.compile(r"application/ld\+json", re.I)
+
+
+@dataclass
+class StructuredData:
+    """Topic-bearing fields from JSON-LD and microdata (schema.org)."""
+    types: List[str] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    brands: List[str] = field(default_factory=list)
+    models: List[str] = field(default_factory=list)
+    headlines: List[str] = field(default_factory=list)
+    keywords: List[str] = field(default_factory=list)
+    about: List[str] = field(default_factory=list)
+
+    @property
+    def is_product(self) -> bool:
+        return any(t in PRODUCT_TYPES for t in self.types)
+
+    @property
+    def is_article(self) -> bool:
+        return any(t in ARTICLE_TYPES for t in self.types)
+
+    def is_rich(self) -> bool:
+        # Enough on its own to describe the page without scoring the body text
+        if self.is_product and self.names and (self.brands or self.models):
+            return True
+        if self.is_article and self.headlines and (self.keywords or self.about):
+            return True
+        return False
+
+    def texts(self) -> List[str]:
+        out: List[str] = []
+        for values in (self.names, self.headlines, self.brands, self.models, self.keywords, self.about):
+            out.extend(values)
+        return out
+
+
+def _add(values: List[str], value: Any) -> None:
+    if isinstance(value, dict):
+        # Nested entities (brand, about, ...) count only by name; an @id is a URL, not a topic
+        value = value.get("name")
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+        return
+    text = re.sub(r"\s+", " ", str(value)).strip()[:_MAX_CHARS]
+    if text and text not in values and len(values) < _MAX_VALUES:
+        values.append(text)
+
+
+def _add_many(values: List[str], value: Any, split_commas: bool = False) -> None:
+    items = value if isinstance(value, list) else [value]
+    for item in items:
+        if split_commas and isinstance(item, str):
+            for part in item.split(","):
+                _add(values, part)
+        else:
+            _add(values, item)
+
+
+def _types_of(node: dict) -> List[str]:
+    t = node.get("@type") or []
+    return [str(x).rsplit("/", 1)[-1].lower() for x in (t if isinstance(t, list) else [t])]
+
+
+def _walk_ld(node: Any, data: StructuredData, depth: int = 0) -> None:
+    if depth > 6:
+        return
+    if isinstance(node, list):
+        for item in node[:50]:
+            _walk_ld(item, data, depth + 1)
+        return
+    if not isinstance(node, dict):
+        return
+    types = _types_of(node)
+    for t in types:
+        if t and t not in data.types:
+            data.types.append(t)
+    if any(t in PRODUCT_TYPES for t in types):
+        _add(data.names, node.get("name"))
+        _add_many(data.brands, node.get("brand") or node.get("manufacturer"))
+        _add_many(data.models, node.get("model") or node.get("mpn"))
+    if any(t in ARTICLE_TYPES for t in types):
+        _add(data.headlines, node.get("headline") or node.get("name"))
+        _add_many(data.keywords, node.get("keywords"), split_commas=True)
+        _add_many(data.about, node.get("about"))
+    # Containers that commonly wrap the entity we want
+    for key in ("@graph", "mainEntity", "mainEntityOfPage", "itemReviewed", "hasVariant"):
+        child = node.get(key)
+        if isinstance(child, (dict, list)):
+            _walk_ld(child, data, depth + 1)
+
+
+def _parse_json_ld(soup: BeautifulSoup, data: StructuredData, limit: Optional[int] = None) -> None:
+    for script in soup.find_all("script", type=_LD_TYPE_RE, limit=limit):
+        raw = script.string or script.get_text()
+        if not raw or len(raw) > _MAX_SCRIPT_CHARS:
+            continue
+        try:
+            payload = json.loads(raw, strict=False)
+        except ValueError:
+            # Some sites wrap JSON-LD in HTML comments or CDATA
+            try:
+                payload = json.loads(re.sub(r"^\s*(?:<!--|<!\[CDATA\[)|(?:-->|\]\]>)\s*$", "", raw), strict=False)
+            except ValueError:
+                continue
+        _walk_ld(payload, data)
+
+
+def _itemprop_value(el) -> str:
+    if el.name == "meta":
+        return el.get("content", "")
+    return el.get("content") or el.get_text(" ", strip=True)
+
+
+def _parse_microdata(soup: BeautifulSoup, data: StructuredData, limit: Optional[int] = None) -> None:
+    for prop in soup.find_all(attrs={"itemprop": True}, limit=limit):
+        names = str(prop.get("itemprop")).lower().split()
+        if prop.has_attr("itemscope"):
+            continue  # nested item; its own itemprops are visited separately
+        scope = prop.find_parent(attrs={"itemscope": True})
+        if scope is None:
+            continue
+        scope_type = str(scope.get("itemtype", "")).rsplit("/", 1)[-1].lower()
+        parent_prop = str(scope.get("itemprop", "")).lower()
+        if scope_type and scope_type not in data.types:
+            data.types.append(scope_type)
+        value = _itemprop_value(prop)
+        if parent_prop in ("brand", "manufacturer") and "name" in names:
+            _add(data.brands, value)
+        elif scope_type in PRODUCT_TYPES:
+            if "name" in names:
+                _add(data.names, value)
+            if "brand" in names:
+                _add(data.brands, value)
+            if "model" in names or "mpn" in names:
+                _add(data.models, value)
+        elif scope_type in ARTICLE_TYPES:
+            if "headline" in names:
+                _add(data.headlines, value)
+            if "keywords" in names:
+                _add_many(data.keywords, value, split_commas=True)
+            if "about" in names:
+                _add(data.about, value)
+
+
+def extract_structured_data(soup: BeautifulSoup, limit: Optional[int] = None) -> StructuredData:
+    """Collect schema.org fields; must run before <script> tags are stripped."""
+    data = StructuredData()
+    _parse_json_ld(soup, data, limit=limit)
+    _parse_microdata(soup, data, limit=limit)
+    return data
+
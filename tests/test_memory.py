@@ -0,0 +1,31 @@
+import gc
+import gzip
+import os
+import tracemalloc
+
+from be_topics.parser import ParseLimits, parse_content
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "large_page.html.gz")
+
+# ParseLimits() peaks at about 16 MB on the fixture; unbounded parsing at about 38 MB
+PEAK_BUDGET_BYTES = 24 * 1024 * 1024
+
+
+def _load_fixture() -> str:
+    with gzip.open(FIXTURE, "rt", encoding="utf-8") as fh:
+        return fh.read()
+
+
+def test_bounded_parse_peak_memory():
+    html = _load_fixture()
+    assert len(html) > ParseLimits().max_html_chars
+    gc.collect()
+    tracemalloc.start()
+    try:
+        parsed = parse_content(html, limits=ParseLimits())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert parsed.title == "Huge Review Page"
+    assert peak < PEAK_BUDGET_BYTES, f"bounded parse peaked at {peak / 1e6:.1f} MB"
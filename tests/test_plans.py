@@ -0,0 +1,34 @@
+import os
+
+from be_topics.bench import benchmark_plans
+
+
+LABELS = os.path.join(os.path.dirname(__file__), "fixtures", "plans", "labels.jsonl")
+
+
+def test_plans_keep_topics_on_labeled_fixtures():
+    report = benchmark_plans(LABELS, top_k=8, repeat=1)
+    overall = report["overall"]
+    assert overall["pages"] == 8
+    assert overall["classification_accuracy"] == 1.0
+    # Plans may only drop work, not the topics full extraction finds
+    assert overall["overlap"] == 1.0
+    assert overall["recall_planned"] >= overall["recall_full"]
+
+
+def test_dollar_amount_deep_in_article_body_is_not_a_product():
+    from be_topics.classifier import PageType, classify_page
+    from be_topics.parser import parse_content
+
+    filler = " ".join(["The committee reviewed the regional budget and its long term effects on schools."] * 8)
+    html = (
+        "<html><head><title>How the city budget changed</title></head><body><article>"
+        "<h1>How the city budget changed</h1>"
+        f"<p>{filler}</p><p>{filler}</p><p>{filler}</p>"
+        "<p>Among the smaller items, a parking fee rose to $45.20 per month.</p>"
+        "</article></body></html>"
+    )
+    content = parse_content(html)
+    assert any(s.startswith("Price:") for s in content.specs)
+    assert not content.price_tagged
+    assert classify_page(content) == PageType.ARTICLE